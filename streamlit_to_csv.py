@@ -1,23 +1,26 @@
 import streamlit as st
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from datetime import datetime, timedelta, timezone
 from dotenv import load_dotenv
 import pandas as pd
 import os
 import shutil
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
+import soupsieve as sv
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options 
 from selenium.webdriver.common.by import By
-from pytube import YouTube
 from youtube_transcript_api import YouTubeTranscriptApi
 import googleapiclient.discovery
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException
+import httplib2
+from googleapiclient.errors import HttpError
+from selenium.common.exceptions import WebDriverException
 import json
 import psycopg2
+from psycopg2.pool import ThreadedConnectionPool
 from datetime import datetime, timedelta, timezone
 import matplotlib.pyplot as plt
 import plotly.graph_objs as go
@@ -33,6 +36,20 @@ import datetime
 import base64
 from unidecode import unidecode
 from fpdf import FPDF
+import time
+import threading
+import queue
+import importlib.util
+import statistics
+from contextlib import contextmanager
+import asyncio
+from urllib.parse import urlparse, urljoin
+from concurrent.futures import ThreadPoolExecutor
+import sqlite3
+import zlib
+import re
+import hashlib
+import tempfile
 
 
 load_dotenv()
@@ -69,8 +86,21 @@ def get_logpath():
 def get_chromedriver_path():
     return shutil.which('chromedriver')
 
+# The scrape profile only needs the DOM: images, fonts, media, ads and trackers are never requested.
+# Blocked URL patterns must match the whole URL, hence the trailing * for CDN query strings.
+SCRAPE_BLOCKED_RESOURCE_TYPES = {
+    'image': ['*.png*', '*.jpg*', '*.jpeg*', '*.gif*', '*.webp*', '*.avif*', '*.svg*', '*.ico*'],
+    'font': ['*.woff*', '*.woff2*', '*.ttf*', '*.otf*', '*.eot*'],
+    'media': ['*.mp4*', '*.webm*', '*.mp3*', '*.m3u8*']
+}
+SCRAPE_BLOCKED_HOSTS = [
+    'googletagmanager.com', 'google-analytics.com', 'doubleclick.net', 'googlesyndication.com',
+    'adservice.google.com', 'amazon-adsystem.com', 'facebook.net', 'scorecardresearch.com',
+    'hotjar.com', 'taboola.com', 'outbrain.com', 'chartbeat.com', 'quantserve.com', 'cdn.permutive.com'
+]
+
 @st.cache_resource(show_spinner=False)
-def get_webdriver_options():
+def get_webdriver_options(profile='scrape'):
     options = Options()
     options.add_argument("--headless")
     options.add_argument("--no-sandbox")
@@ -79,6 +109,12 @@ def get_webdriver_options():
     options.add_argument("--disable-features=NetworkService")
     options.add_argument("--window-size=1920x1080")
     options.add_argument("--disable-features=VizDisplayCompositor")
+    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/83.0.4103.116 Safari/537.36")
+    if profile == 'scrape':
+        # Return from driver.get at DOMContentLoaded; callers wait explicitly for the elements they need
+        options.page_load_strategy = 'eager'
+        options.add_argument("--blink-settings=imagesEnabled=false")
+        options.add_experimental_option("prefs", {"profile.managed_default_content_settings.images": 2})
     return options
 
 def get_webdriver_service():
@@ -87,6 +123,135 @@ def get_webdriver_service():
     )
     return service
 
+def block_page_resources(driver):
+    # CDP request blocking is per tab, so this runs for every tab before it navigates
+    patterns = [pattern for patterns in SCRAPE_BLOCKED_RESOURCE_TYPES.values() for pattern in patterns]
+    patterns += [f'*{host}*' for host in SCRAPE_BLOCKED_HOSTS]
+    driver.execute_cdp_cmd('Network.enable', {})
+    driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': patterns})
+
+def create_webdriver(profile='scrape'):
+    driver = webdriver.Chrome(service=get_webdriver_service(), options=get_webdriver_options(profile))
+    if profile == 'scrape':
+        block_page_resources(driver)
+    return driver
+
+WEBDRIVER_POOL_SIZE = int(os.getenv('WEBDRIVER_POOL_SIZE', 2))
+WEBDRIVER_MAX_PAGES = int(os.getenv('WEBDRIVER_MAX_PAGES', 50))
+WEBDRIVER_CHECKOUT_TIMEOUT = 120
+
+class WebDriverPool:
+    # Keeps a few headless Chrome instances alive for the whole process so scrapers stop paying a
+    # browser cold start per page. At most `size` browsers exist; sessions wait for a free one.
+    def __init__(self, size=WEBDRIVER_POOL_SIZE, max_pages=WEBDRIVER_MAX_PAGES):
+        self.size = size
+        self.max_pages = max_pages
+        self.idle = queue.LifoQueue()
+        self.slots = threading.BoundedSemaphore(size)
+        self.page_counts = {}
+
+    def _create(self):
+        driver = create_webdriver()
+        self.page_counts[driver] = 0
+        return driver
+
+    def _is_healthy(self, driver):
+        try:
+            driver.current_url
+            return True
+        except WebDriverException:
+            return False
+
+    def _discard(self, driver):
+        self.page_counts.pop(driver, None)
+        try:
+            driver.quit()
+        except WebDriverException:
+            pass
+
+    def checkout(self, timeout=WEBDRIVER_CHECKOUT_TIMEOUT):
+        if not self.slots.acquire(timeout=timeout):
+            raise TimeoutError("No browser became available in the WebDriver pool.")
+        try:
+            while True:
+                try:
+                    driver = self.idle.get_nowait()
+                except queue.Empty:
+                    return self._create()
+                if self._is_healthy(driver):
+                    return driver
+                self._discard(driver)
+        except Exception:
+            self.slots.release()
+            raise
+
+    def checkin(self, driver, pages=1, broken=False):
+        try:
+            self.page_counts[driver] = self.page_counts.get(driver, 0) + pages
+            # Recycle long-lived browsers so leaked tabs and memory growth don't accumulate
+            if broken or self.page_counts[driver] >= self.max_pages or not self._is_healthy(driver):
+                self._discard(driver)
+            else:
+                self.idle.put(driver)
+        finally:
+            self.slots.release()
+
+    @contextmanager
+    def driver(self, pages=1):
+        driver = self.checkout()
+        broken = False
+        try:
+            yield driver
+        except WebDriverException:
+            broken = True
+            raise
+        finally:
+            self.checkin(driver, pages=pages, broken=broken)
+
+@st.cache_resource(show_spinner=False)
+def get_webdriver_pool():
+    return WebDriverPool()
+
+BROWSER_TABS_PER_DRIVER = int(os.getenv('BROWSER_TABS_PER_DRIVER', 4))
+
+def is_tab_ready(driver, ready_locator):
+    # A freshly opened tab reports readyState 'complete' for about:blank before navigation starts
+    if driver.current_url == 'about:blank' or driver.execute_script("return document.readyState") == 'loading':
+        return False
+    return ready_locator is None or bool(driver.find_elements(*ready_locator))
+
+def load_pages_in_tabs(driver, urls, ready_locator=None, timeout=30, max_tabs=BROWSER_TABS_PER_DRIVER):
+    # Open each url in its own tab of one browser so navigations overlap, and yield
+    # (index, page_source) as each tab becomes ready. Tabs that time out yield whatever has loaded.
+    driver.implicitly_wait(0)
+    original_handle = driver.current_window_handle
+    pending = list(enumerate(urls))
+    open_tabs = {}
+
+    try:
+        while pending or open_tabs:
+            while pending and len(open_tabs) < max_tabs:
+                index, url = pending.pop(0)
+                driver.switch_to.new_window('tab')
+                block_page_resources(driver)
+                # Assigning location returns immediately, unlike driver.get which blocks until load
+                driver.execute_script("window.location.href = arguments[0];", url)
+                open_tabs[driver.current_window_handle] = (index, time.monotonic() + timeout)
+
+            for handle, (index, deadline) in list(open_tabs.items()):
+                driver.switch_to.window(handle)
+                if is_tab_ready(driver, ready_locator) or time.monotonic() >= deadline:
+                    page_source = driver.page_source
+                    driver.close()
+                    del open_tabs[handle]
+                    yield index, page_source
+            time.sleep(0.1)
+    finally:
+        for handle in open_tabs:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(original_handle)
+
 def delete_selenium_log(logpath):
     if os.path.exists(logpath):
         os.remove(logpath)
@@ -99,62 +264,941 @@ def show_selenium_log(logpath):
     else:
         st.warning('No log file found!')
 
-def parse_timestamp(timestamp_str):
-    try:
-        dt = datetime.strptime(timestamp_str, '%Y-%m-%dT%H:%M:%S.%f%z')
-    except ValueError:
-        dt = datetime.fromisoformat(timestamp_str)
+# lxml builds trees several times faster than the pure-Python html.parser, so use it when installed
+HTML_PARSER = 'lxml' if importlib.util.find_spec('lxml') else 'html.parser'
+
+def parse_html(html, parse_only=None, parser=HTML_PARSER):
+    # parse_only takes a SoupStrainer so index pages only build the subtrees a scraper reads
+    return BeautifulSoup(html, parser, parse_only=parse_only)
+
+# CoinDesk keeps whole card containers so the card date survives, plus bare title nodes for
+# cards rendered outside a container
+COINDESK_NEWS_CARDS = SoupStrainer(['div', 'h6'], class_=re.compile(r'article-cardstyles__StyledWrapper|\bdiMXjy\b'))
+COINDESK_SECTION_CARDS = SoupStrainer(['div', 'h5'], class_=re.compile(r'article-cardstyles__StyledWrapper|\bkeiOrg\b'))
+NEWSBTC_HEADLINES = SoupStrainer(['h2', 'h3'], class_='jeg_post_title')
+CRYPTO_NEWS_HEADLINES = SoupStrainer('p', class_='post-loop__title')
+COINTELEGRAPH_POSTS = SoupStrainer('div', class_="category-page__content-col")
+
+HTTP_TIMEOUT = (5, 30)  # (connect, read) seconds
+HTTP_DEFAULT_POOL_SIZE = 10
+HTTP_HOST_POOL_SIZES = {
+    'discord.com': 8,
+    'decrypt.co': 10,
+    'www.coindesk.com': 20,
+    'www.newsbtc.com': 10,
+    'crypto.news': 10,
+    'cointelegraph.com': 10,
+    'cryptorank.io': 4,
+    'pro-api.coinmarketcap.com': 2
+}
 
-    if dt.tzinfo is None or dt.tzinfo.utcoffset(dt) is None:
-        dt = dt.replace(tzinfo=timezone.utc)
+class TimeoutHTTPAdapter(HTTPAdapter):
+    # requests has no session-wide timeout, so the adapter fills one in for every request
+    def __init__(self, *args, timeout=HTTP_TIMEOUT, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
 
-    return dt
+    def send(self, request, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().send(request, **kwargs)
+
+@st.cache_resource(show_spinner=False)
+def get_http_session():
+    # One keep-alive session for the whole process so repeated hits to a host reuse connections.
+    # 429s are left to the caller: Discord has its own bucket scheduler. urllib3 would otherwise
+    # sleep and retry any 429 carrying Retry-After behind the scheduler's back.
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        backoff_jitter=0.5,
+        status_forcelist=[500, 502, 503, 504],
+        allowed_methods=['GET', 'HEAD'],
+        respect_retry_after_header=False,
+        raise_on_status=False
+    )
+    session = requests.Session()
+    default_adapter = TimeoutHTTPAdapter(pool_maxsize=HTTP_DEFAULT_POOL_SIZE, max_retries=retry)
+    session.mount('https://', default_adapter)
+    session.mount('http://', default_adapter)
+    for host, pool_size in HTTP_HOST_POOL_SIZES.items():
+        session.mount(f'https://{host}/', TimeoutHTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry))
+    return session
+
+HTTP_MAX_CONCURRENCY_PER_HOST = 6
+
+async def fetch_pages_async(urls, max_per_host=HTTP_MAX_CONCURRENCY_PER_HOST, on_page=None):
+    loop = asyncio.get_running_loop()
+    session = get_http_session()
+    semaphores = {}
+
+    async def fetch(index, url):
+        # Bound concurrency per host so a long article list doesn't hammer one site
+        semaphore = semaphores.setdefault(urlparse(url).netloc, asyncio.Semaphore(max_per_host))
+        async with semaphore:
+            try:
+                response = await loop.run_in_executor(None, session.get, url)
+                html, status = response.text, response.status_code
+            except requests.RequestException as e:
+                print(f"An error occurred while fetching {url}: {e}")
+                html, status = '', None
+        # Coroutines run on the calling thread, so on_page can safely draw Streamlit elements
+        if on_page:
+            on_page(index, html, status)
+        return html
+
+    return await asyncio.gather(*(fetch(index, url) for index, url in enumerate(urls)))
+
+def fetch_pages(urls, max_per_host=HTTP_MAX_CONCURRENCY_PER_HOST, on_page=None):
+    # Fetch every page concurrently from one blocking call; results come back in the order of urls.
+    # on_page(index, html, status) is called as each page completes, in completion order;
+    # status is None when the request itself failed.
+    return asyncio.run(fetch_pages_async(urls, max_per_host, on_page))
+
+def render_pages(urls, ready_selector, tier_key, render, stream=True, slots=None):
+    # Pre-allocate one slot per page so each article lands in index order whichever finishes first
+    slots = slots or [st.empty() for _ in urls]
+    start = time.perf_counter()
+    first_render = []
+
+    def on_page(index, html):
+        with slots[index].container():
+            render(index, html)
+        if not first_render:
+            first_render.append(time.perf_counter() - start)
+
+    if stream:
+        fetch_pages_tiered(urls, ready_selector, tier_key, on_page=on_page)
+    else:
+        for index, html in enumerate(fetch_pages_tiered(urls, ready_selector, tier_key)):
+            on_page(index, html)
+
+    if first_render:
+        st.caption(f"First article shown after {first_render[0]:.2f}s, all {len(urls)} after {time.perf_counter() - start:.2f}s.")
+
+FETCH_TIER_HTTP = 'http'
+FETCH_TIER_BROWSER = 'browser'
+FETCH_TIER_BROWSER_TTL = 30 * 60  # seconds before a page kind that needed the browser gets a plain GET again
+FETCH_BROWSER_STATUSES = {403, 429, 503}  # what bot walls answer a plain GET with; the browser may get through
+
+@st.cache_resource(show_spinner=False)
+def get_fetch_tiers():
+    # (site, page kind) -> (tier that last produced a usable page, when), shared by every session
+    return {}
+
+def get_fetch_tier(tier_key):
+    tier, decided_at = get_fetch_tiers().get(tier_key, (None, 0.0))
+    if tier == FETCH_TIER_BROWSER and time.monotonic() - decided_at > FETCH_TIER_BROWSER_TTL:
+        return None
+    return tier
+
+def set_fetch_tier(tier_key, tier):
+    get_fetch_tiers()[tier_key] = (tier, time.monotonic())
+
+def has_selector(html, selector):
+    # Only build the subtrees of the selector's leading tag (the whole tree if it names none);
+    # the page is parsed in full once, later, by whatever extracts it
+    match = re.match(r'[a-zA-Z][\w-]*', selector)
+    return parse_html(html, SoupStrainer(match.group(0)) if match else None).select_one(selector) is not None
+
+def get_conditional(url, etag=None, last_modified=None):
+    # GET with the validators from an earlier response; a 304 means that copy is still current
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    return get_http_session().get(url, headers=headers)
+
+def fetch_pages_tiered(urls, ready_selector, tier_key, on_page=None):
+    # Try a plain GET first and only send pages missing ready_selector to the browser pool.
+    # urls are all one kind of page (tier_key, e.g. a site's articles); once a whole batch of GETs
+    # comes back without ready_selector that kind skips the GET for a while. Returns html in url
+    # order; pages that could not be loaded at all come back as ''.
+    pages = [None] * len(urls)
+    passed = []
+    needs_browser = []
+
+    def finish(index, html):
+        pages[index] = html
+        if on_page:
+            on_page(index, html)
+
+    def on_http_page(index, html, status):
+        if status is None or status in FETCH_BROWSER_STATUSES:
+            # Failed or blocked request: the browser gets it this time without learning anything from it
+            return
+        if not 200 <= status < 300:
+            # A missing or gone page is no different in the browser
+            print(f"Could not load {urls[index]}: HTTP {status}")
+            finish(index, '')
+        elif has_selector(html, ready_selector):
+            passed.append(index)
+            finish(index, html)
+        else:
+            needs_browser.append(index)
+
+    if get_fetch_tier(tier_key) != FETCH_TIER_BROWSER:
+        fetch_pages(urls, on_page=on_http_page)
+
+    # One odd page (off-template, paywalled) doesn't move the rest of its kind to the browser
+    if passed:
+        set_fetch_tier(tier_key, FETCH_TIER_HTTP)
+    elif needs_browser:
+        set_fetch_tier(tier_key, FETCH_TIER_BROWSER)
+    browser_indexes = [i for i, html in enumerate(pages) if html is None]
+    if browser_indexes:
+        try:
+            with get_webdriver_pool().driver(pages=len(browser_indexes)) as driver:
+                browser_urls = [urls[i] for i in browser_indexes]
+                for position, page_source in load_pages_in_tabs(driver, browser_urls, ready_locator=(By.CSS_SELECTOR, ready_selector)):
+                    finish(browser_indexes[position], page_source)
+        except (WebDriverException, TimeoutError) as e:
+            # No browser to be had: the pages it had not loaded yet are reported as not loaded
+            print(f"An error occurred while loading pages in the browser: {e}")
+            for index in browser_indexes:
+                if pages[index] is None:
+                    finish(index, '')
+    return pages
+
+# Per-site extraction specs. Selectors are CSS, tried in list order; cards are collected
+# selector by selector so the index order of each list is kept.
+COINDESK_ARTICLE = {
+    'url_prefix': 'https://www.coindesk.com/',
+    'link': 'a.card-title',
+    'card_date': 'div.timing-data span, time',
+    'article_ready': 'h1.typography__StyledTypography-sc-owin6q-0.bSOJsQ',
+    'title': ['h1.typography__StyledTypography-sc-owin6q-0.bSOJsQ'],
+    'date': [
+        'div.at-created.label-with-icon span.typography__StyledTypography-sc-owin6q-0.hcIsFR',
+        'div.align-right span.typography__StyledTypography-sc-owin6q-0.hcIsFR',
+    ],
+    'image': ['div.featured-imagestyles__FeaturedImageWrapper-sc-ojmof1-0.jGviVP picture.responsive-picturestyles__ResponsivePictureWrapper-sc-1urqrom-0.iLCXlQ img'],
+    'body': ['div.common-textstyles__StyledWrapper-sc-18pd49k-0.eSbCkN p'],
+}
+
+SITE_SPECS = {
+    'decrypt': {
+        'name': 'Decrypt',
+        'index_url': 'https://decrypt.co/news',
+        'url_prefix': 'https://decrypt.co/',
+        'index_strainer': None,
+        'index_ready': 'a.linkbox__overlay',
+        'cards': [
+            "div[class='mt-2 md:col-span-4 md:mt-0']",
+            "h3[class='font-medium xl:font-normal mt-1 font-akzidenz-grotesk text-black gg-dark:text-neutral-100 gg-dark:font-poppins scene:font-itc-avant-garde-gothic-pro scene:font-medium scene:mt-2 degen-alley-dark:text-white text-base leading-4.5 xl:text-xl xl:leading-6']",
+            "h3[class='font-medium mt-1 font-akzidenz-grotesk text-black gg-dark:text-neutral-100 gg-dark:font-poppins scene:font-itc-avant-garde-gothic-pro scene:font-medium scene:mt-2 degen-alley-dark:text-white text-base leading-4.5 xl:text-xl xl:leading-6']",
+            "div[class='mb-5 pb-5 last-of-type:mb-0']",
+        ],
+        'link': 'a.linkbox__overlay',
+        'card_date': None,
+        'article_ready': 'time[datetime]',
+        'title': ['h1'],
+        'date': ['time[datetime]'],
+        'image': ["div[class*='gg-dark:p-1'] img"],
+        'body': ["div[class*='grid grid-cols-1 md:grid-cols-8 unreset post-content md:pb-20'] p[class*='font-meta-serif-pro scene:font-noto-sans scene:text-base scene:md:text-lg font-normal text-lg md:text-xl md:leading-9 tracking-px text-body gg-dark:text-neutral-100']"],
+    },
+    'coindesk_news': {
+        **COINDESK_ARTICLE,
+        'name': 'CoinDesk News',
+        'index_url': 'https://www.coindesk.com/tag/news/',
+        'index_strainer': COINDESK_NEWS_CARDS,
+        'index_ready': 'h6.typography__StyledTypography-sc-owin6q-0.diMXjy',
+        'cards': ["div[class*='article-cardstyles__StyledWrapper']", 'h6.typography__StyledTypography-sc-owin6q-0.diMXjy'],
+    },
+    'coindesk_markets': {
+        **COINDESK_ARTICLE,
+        'name': 'CoinDesk Markets',
+        'index_url': 'https://www.coindesk.com/markets/',
+        'index_strainer': COINDESK_SECTION_CARDS,
+        'index_ready': 'h5.typography__StyledTypography-sc-owin6q-0.keiOrg',
+        'cards': ["div[class*='article-cardstyles__StyledWrapper']", 'h5.typography__StyledTypography-sc-owin6q-0.keiOrg'],
+    },
+    'coindesk_business': {
+        **COINDESK_ARTICLE,
+        'name': 'CoinDesk Business',
+        'index_url': 'https://www.coindesk.com/business/',
+        'index_strainer': COINDESK_SECTION_CARDS,
+        'index_ready': 'h5.typography__StyledTypography-sc-owin6q-0.keiOrg',
+        'cards': ["div[class*='article-cardstyles__StyledWrapper']", 'h5.typography__StyledTypography-sc-owin6q-0.keiOrg'],
+    },
+    'newsbtc': {
+        'name': 'NewsBTC',
+        'index_url': 'https://www.newsbtc.com/news/',
+        'url_prefix': 'https://www.newsbtc.com/',
+        'index_strainer': NEWSBTC_HEADLINES,
+        'index_ready': '.jeg_post_title a',
+        'cards': ['h2.jeg_post_title', 'h3.jeg_post_title'],
+        'link': 'a',
+        'card_date': None,
+        'article_ready': 'h1.jeg_post_title',
+        'title': ['h1.jeg_post_title'],
+        'date': ['div.jeg_meta_date a'],
+        'image': ['div.single-post-hero-background img'],
+        'body': ['div.content-inner p'],
+    },
+    'crypto_news': {
+        'name': 'crypto.news',
+        'index_url': 'https://crypto.news/news/',
+        'url_prefix': 'https://crypto.news/',
+        'index_strainer': CRYPTO_NEWS_HEADLINES,
+        'index_ready': 'p.post-loop__title a',
+        'cards': ['p.post-loop__title'],
+        'link': 'a',
+        'card_date': None,
+        'article_ready': 'h1.post-detail__title',
+        'title': ['h1.post-detail__title'],
+        'date': ['time.post-detail__date'],
+        'image': ['div.post-detail__media img'],
+        'body': ['div.post-detail__content p'],
+    },
+    'cointelegraph': {
+        'name': 'Cointelegraph',
+        'index_url': 'https://cointelegraph.com/category/latest-news',
+        'url_prefix': 'https://cointelegraph.com/',
+        'index_strainer': COINTELEGRAPH_POSTS,
+        'index_ready': 'div.category-page__posts',
+        'cards': ['div.category-page__posts div.post-card-inline__header'],
+        'link': 'a.post-card-inline__title-link',
+        'card_date': 'time.post-card-inline__date',
+        'article_ready': 'h1.post__title',
+        'title': ['article.post__article h1.post__title'],
+        'date': [],
+        # Images are blocked in the scrape profile, so the cover never gets its lazy-image_loaded class
+        'image': ['div.post-cover__image img'],
+        'body': ['div.post-content.relative p'],
+    },
+}
+
+SITE_SPEC_SELECTOR_LISTS = ['cards', 'title', 'date', 'image', 'body']
+SITE_SPEC_SELECTORS = ['link', 'card_date']
+
+def compile_site_spec(spec):
+    compiled = dict(spec)
+    for key in SITE_SPEC_SELECTOR_LISTS:
+        compiled[key] = [sv.compile(selector) for selector in spec[key]]
+    for key in SITE_SPEC_SELECTORS:
+        compiled[key] = sv.compile(spec[key]) if spec[key] else None
+    return compiled
+
+@st.cache_resource(show_spinner=False)
+def get_site_specs():
+    # Compile every selector once per process instead of re-parsing them on each rerun
+    return {site: compile_site_spec(spec) for site, spec in SITE_SPECS.items()}
+
+def select_first(selectors, soup):
+    for selector in selectors:
+        element = selector.select_one(soup)
+        if element:
+            return element
+    return None
+
+def extract_index_cards(spec, html, limit=None):
+    # Returns up to limit (default all) {url, title, date} dicts in index order, each URL once
+    soup = parse_html(html, spec['index_strainer'])
+    cards = []
+    seen_urls = set()
+    for card_selector in spec['cards']:
+        for card in card_selector.select(soup):
+            link = spec['link'].select_one(card)
+            if not link or not link.get('href'):
+                continue
+            url = urljoin(spec['url_prefix'], link['href'])
+            if url in seen_urls:
+                continue
+            seen_urls.add(url)
+            date = spec['card_date'].select_one(card) if spec['card_date'] else None
+            cards.append({
+                'url': url,
+                'title': link.get_text(strip=True),
+                'date': date.get_text(strip=True) if date else '',
+            })
+            if limit and len(cards) >= limit:
+                return cards
+    return cards
+
+def extract_article(spec, html, card):
+    # Returns {url, title, date, image_url, body}; index card values fill in anything the page lacks
+    soup = parse_html(html)
+    title = select_first(spec['title'], soup)
+    date = select_first(spec['date'], soup)
+    image = select_first(spec['image'], soup)
+    paragraphs = next((found for found in (selector.select(soup) for selector in spec['body']) if found), [])
+    return {
+        'url': card['url'],
+        'title': title.get_text(strip=True) if title else card['title'],
+        'date': date.get_text(strip=True) if date else card['date'],
+        'image_url': image.get('src', '') if image else '',
+        'body': '\n\n'.join(paragraph.get_text(strip=True) for paragraph in paragraphs),
+    }
+
+ARTICLE_CACHE_PATH = os.getenv('ARTICLE_CACHE_PATH', 'article_cache.sqlite3')
+ARTICLE_CACHE_TTL = int(os.getenv('ARTICLE_CACHE_TTL', 7 * 24 * 60 * 60))
+ARTICLE_CACHE_MAX_BYTES = int(os.getenv('ARTICLE_CACHE_MAX_BYTES', 50 * 1024 * 1024))
+ARTICLE_CACHE_FIELDS = ['title', 'date', 'image_url', 'body']
+
+class ArticleCache:
+    # Extracted articles keyed by URL, stored as zlib-compressed JSON in SQLite.
+    # Entries older than ttl are misses; the least recently read go first once max_bytes is exceeded.
+    def __init__(self, path, ttl, max_bytes):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS articles ("
+            "url TEXT PRIMARY KEY, data BLOB NOT NULL, size INTEGER NOT NULL, "
+            "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self.conn.execute("CREATE INDEX IF NOT EXISTS articles_accessed_at ON articles (accessed_at)")
+        self.conn.commit()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM articles").fetchone()[0]
+
+    def get_many(self, urls):
+        # Returns {url: article} for every fresh entry
+        now = time.time()
+        with self.lock:
+            placeholders = ', '.join('?' for _ in urls)
+            rows = self.conn.execute(
+                f"SELECT url, data FROM articles WHERE url IN ({placeholders}) AND stored_at >= ?",
+                [*urls, now - self.ttl]
+            ).fetchall() if urls else []
+            articles = {url: {'url': url, **json.loads(zlib.decompress(data))} for url, data in rows}
+            self.conn.executemany("UPDATE articles SET accessed_at = ? WHERE url = ?", [(now, url) for url in articles])
+            self.conn.commit()
+            self.hits += len(articles)
+            self.misses += len(set(urls)) - len(articles)
+        return articles
+
+    def put(self, article):
+        data = zlib.compress(json.dumps({field: article[field] for field in ARTICLE_CACHE_FIELDS}).encode('utf-8'))
+        now = time.time()
+        with self.lock:
+            previous = self.conn.execute("SELECT size FROM articles WHERE url = ?", (article['url'],)).fetchone()
+            self.conn.execute(
+                "INSERT OR REPLACE INTO articles (url, data, size, stored_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (article['url'], data, len(data), now, now)
+            )
+            self.total_bytes += len(data) - (previous[0] if previous else 0)
+            if self.total_bytes > self.max_bytes:
+                self._evict(now)
+            self.conn.commit()
+
+    def _evict(self, now):
+        # Drop expired entries, then the least recently read until the cache fits again
+        self.conn.execute("DELETE FROM articles WHERE stored_at < ?", (now - self.ttl,))
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM articles").fetchone()[0]
+        evicted = []
+        for url, size in self.conn.execute("SELECT url, size FROM articles ORDER BY accessed_at"):
+            if self.total_bytes <= self.max_bytes:
+                break
+            evicted.append((url,))
+            self.total_bytes -= size
+        self.conn.executemany("DELETE FROM articles WHERE url = ?", evicted)
+
+@st.cache_resource(show_spinner=False)
+def get_article_cache():
+    return ArticleCache(ARTICLE_CACHE_PATH, ARTICLE_CACHE_TTL, ARTICLE_CACHE_MAX_BYTES)
+
+class IndexPageCache:
+    # Parsed card lists of index pages with the ETag / Last-Modified they were served with,
+    # kept next to the article cache so a 304 can skip both the transfer and the parse
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS index_pages ("
+            "url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, cards BLOB NOT NULL, stored_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def get(self, url):
+        with self.lock:
+            row = self.conn.execute("SELECT etag, last_modified, cards FROM index_pages WHERE url = ?", (url,)).fetchone()
+        if not row:
+            return None
+        etag, last_modified, cards = row
+        return {'etag': etag, 'last_modified': last_modified, 'cards': json.loads(zlib.decompress(cards))}
+
+    def put(self, url, etag, last_modified, cards):
+        data = zlib.compress(json.dumps(cards).encode('utf-8'))
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO index_pages (url, etag, last_modified, cards, stored_at) VALUES (?, ?, ?, ?, ?)",
+                (url, etag, last_modified, data, time.time())
+            )
+            self.conn.commit()
+
+@st.cache_resource(show_spinner=False)
+def get_index_page_cache():
+    return IndexPageCache(ARTICLE_CACHE_PATH)
+
+def scrape_site_index(site, limit):
+    # Revalidate the index with the stored validators; a 304 reuses the card list parsed last time.
+    # Index pages that only render in the browser have no validators and are loaded in full.
+    spec = get_site_specs()[site]
+    url = spec['index_url']
+    tier_key = (site, 'index')
+
+    if get_fetch_tier(tier_key) != FETCH_TIER_BROWSER:
+        index_cache = get_index_page_cache()
+        entry = index_cache.get(url)
+        try:
+            response = get_conditional(url, entry['etag'], entry['last_modified']) if entry else get_conditional(url)
+        except requests.RequestException as e:
+            print(f"An error occurred while fetching {url}: {e}")
+            response = None
+
+        if response is not None and response.status_code == 304 and entry:
+            return entry['cards'][:limit]
+        if response is not None and response.ok:
+            cards = extract_index_cards(spec, response.text)
+            if cards:
+                set_fetch_tier(tier_key, FETCH_TIER_HTTP)
+                index_cache.put(url, response.headers.get('ETag'), response.headers.get('Last-Modified'), cards)
+                return cards[:limit]
+            # The page arrived but only renders its cards in the browser
+            set_fetch_tier(tier_key, FETCH_TIER_BROWSER)
+
+    html = fetch_pages_tiered([url], spec['index_ready'], tier_key)[0]
+    return extract_index_cards(spec, html, limit)
+
+def display_article(article):
+    st.markdown(f"# {article['title']}")
+    st.write(article['url'])
+    if article['date']:
+        st.write(f"**Date:** {article['date']}")
+    if article['image_url']:
+        st.image(article['image_url'], caption='Article Image', use_column_width=True)
+    st.markdown(article['body'])
+    st.markdown("---")
+
+def render_site_articles(site, cards, stream=True):
+    # Articles already in the disk cache are shown straight away; only the rest are fetched and parsed
+    spec = get_site_specs()[site]
+    cache = get_article_cache()
+    cached = cache.get_many([card['url'] for card in cards])
+    slots = [st.empty() for _ in cards]
+    for index, card in enumerate(cards):
+        if card['url'] in cached:
+            with slots[index].container():
+                display_article(cached[card['url']])
+
+    missing = [index for index, card in enumerate(cards) if card['url'] not in cached]
+
+    def render(position, html):
+        if not html:
+            st.warning(f"Could not load {cards[missing[position]]['url']}")
+            return
+        article = extract_article(spec, html, cards[missing[position]])
+        # Don't keep pages that failed to parse
+        if article['body']:
+            cache.put(article)
+        display_article(article)
+
+    render_pages([cards[index]['url'] for index in missing], spec['article_ready'], (site, 'article'), render, stream, [slots[index] for index in missing])
+    st.caption(f"Article cache: {len(cached)} of {len(cards)} from disk this run, {cache.hits} hits / {cache.misses} misses since start.")
+
+def render_site_headlines(site, cards):
+    # Headline mode: one request for the index, and each article only once its expander is ticked
+    for index, card in enumerate(cards):
+        st.markdown(f"**{card['title']}**  \n{card['url']}")
+        if card['date']:
+            st.caption(card['date'])
+        with st.expander("Article"):
+            # Keyed by position: card lists stored before duplicates were dropped may repeat a URL
+            if st.checkbox("Load article", key=f"load_{site}_{index}"):
+                with st.spinner("Fetching article..."):
+                    article = get_site_articles(site, [card])[0]
+                if not article['body']:
+                    st.warning("Could not load the article.")
+                if article['image_url']:
+                    st.image(article['image_url'], caption='Article Image', use_column_width=True)
+                st.markdown(article['body'])
+
+def run_news_site_tab(site, title, default_articles=1, max_articles=None, headline_mode=False):
+    st.subheader(title)
+    num_articles = st.number_input("Enter the number of articles to retrieve:", value=default_articles, min_value=1, max_value=max_articles, step=1)
+    headlines = headline_mode and st.checkbox("Headlines only (load articles on demand)", value=True)
+    stream = not headlines and st.checkbox("Show articles as they load", value=True)
+
+    with st.spinner("Scraping data..."):
+        cards = scrape_site_index(site, num_articles)
+        if headlines:
+            render_site_headlines(site, cards)
+        else:
+            render_site_articles(site, cards, stream)
+
+def get_site_articles(site, cards):
+    # Cached or freshly extracted articles for cards, in card order.
+    # Makes no st.* calls so it can run on a worker thread.
+    spec = get_site_specs()[site]
+    cache = get_article_cache()
+    articles = cache.get_many([card['url'] for card in cards])
+    missing = [card for card in cards if card['url'] not in articles]
+    for card, html in zip(missing, fetch_pages_tiered([card['url'] for card in missing], spec['article_ready'], (site, 'article'))):
+        article = extract_article(spec, html or '', card)
+        if article['body']:
+            cache.put(article)
+        articles[card['url']] = article
+    return [articles[card['url']] for card in cards]
+
+def scrape_site_articles(site, limit):
+    # Non-streaming version of the news tabs for one site: index, then its articles in index order
+    name = SITE_SPECS[site]['name']
+    return [{**article, 'source': name} for article in get_site_articles(site, scrape_site_index(site, limit))]
+
+RELATIVE_DATE_PATTERN = re.compile(r'(\d+)\s+(minute|hour|day|week)s?\s+ago', re.IGNORECASE)
+
+def parse_article_date(text, now):
+    # Sites print either relative ("3 hours ago") or CoinDesk style ("Jan 5, 2024 at 3:04 p.m. UTC") dates
+    match = RELATIVE_DATE_PATTERN.search(text)
+    if match:
+        return now - timedelta(**{f"{match.group(2).lower()}s": int(match.group(1))})
+    cleaned = text.replace(' at ', ' ').replace('p.m.', 'PM').replace('a.m.', 'AM')
+    return pd.to_datetime(cleaned, utc=True, errors='coerce')
+
+def canonical_url(url):
+    parsed = urlparse(url)
+    return f"{parsed.netloc.lower().removeprefix('www.')}{parsed.path.rstrip('/')}"
+
+def title_hash(title):
+    normalized = ' '.join(re.sub(r'[^\w\s]', '', title.lower()).split())
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+def dedupe_articles(articles):
+    # Keep the first of any articles sharing a canonical URL or a normalized title
+    seen_urls = set()
+    seen_titles = set()
+    unique = []
+    for article in articles:
+        url_key = canonical_url(article['url'])
+        title_key = title_hash(article['title']) if article['title'] else None
+        if url_key in seen_urls or (title_key and title_key in seen_titles):
+            continue
+        seen_urls.add(url_key)
+        if title_key:
+            seen_titles.add(title_key)
+        unique.append(article)
+    return unique
+
+def scrape_all_news(per_site):
+    # Every site runs on its own thread, so the feed takes about as long as the slowest site.
+    # Returns the merged, deduplicated feed newest first plus per-site seconds.
+    timings = {}
+
+    def scrape(site):
+        start = time.perf_counter()
+        try:
+            return scrape_site_articles(site, per_site)
+        except Exception as e:
+            print(f"An error occurred while scraping {site}: {e}")
+            return []
+        finally:
+            timings[SITE_SPECS[site]['name']] = time.perf_counter() - start
+
+    with ThreadPoolExecutor(max_workers=len(SITE_SPECS)) as executor:
+        results = list(executor.map(scrape, SITE_SPECS))
+
+    now = pd.Timestamp.now(tz='UTC')
+    feed = pd.DataFrame([article for articles in results for article in articles], columns=['source', 'date', 'title', 'url', 'image_url', 'body'])
+    feed.insert(1, 'published', [parse_article_date(date, now) for date in feed['date']])
+    feed = feed.sort_values('published', ascending=False, na_position='last', kind='stable')
+    feed = pd.DataFrame(dedupe_articles(feed.to_dict('records')), columns=feed.columns)
+    return feed, timings
+
+DISCORD_API_URL = 'https://discord.com/api/v9'
+DISCORD_MAX_WORKERS = 8
+DISCORD_RESYNC_POLL = 0.05  # seconds between checks while an exhausted bucket waits for its next reset time
+DISCORD_RESYNC_TIMEOUT = 5  # after this long without a resync, one request is let through to probe the bucket
+
+class DiscordRateLimiter:
+    # Tracks Discord's per-route rate-limit buckets from the X-RateLimit-* headers and holds
+    # requests back until their bucket has room, so concurrent fetches never trip a 429 on purpose.
+    def __init__(self, max_retries=5):
+        self.max_retries = max_retries
+        self.lock = threading.Lock()
+        self.route_buckets = {}
+        self.buckets = {}
+        self.probing = set()
+        self.global_reset_at = 0.0
+        self.throttled_seconds = 0.0
+        self.rate_limited_count = 0
+
+    def _bucket_key(self, route):
+        # Routes sharing a bucket hash share limits per top-level resource, e.g. per channel id
+        bucket_hash = self.route_buckets.get(route)
+        return (bucket_hash, route.split('/')[2]) if bucket_hash else route
+
+    def _acquire(self, route):
+        # Returns True when this request is the one probing a route whose bucket is not known yet
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                bucket = self.buckets.get(self._bucket_key(route))
+                if bucket and bucket['reset_at'] is not None and now >= bucket['reset_at']:
+                    # The bucket is full again, but its next reset is only known once a response resyncs it
+                    bucket['remaining'] = bucket['limit']
+                    bucket['reset_at'] = None
+                    bucket['reset_seen_at'] = now
+
+                wait = self.global_reset_at - now
+                if bucket and bucket['remaining'] <= 0:
+                    if bucket['reset_at'] is not None:
+                        wait = max(wait, bucket['reset_at'] - now)
+                    elif now - bucket['reset_seen_at'] < DISCORD_RESYNC_TIMEOUT:
+                        wait = max(wait, DISCORD_RESYNC_POLL)
+                    else:
+                        # No in-flight response resynced the bucket; let a single request through
+                        bucket['remaining'] = 1
+                        bucket['reset_seen_at'] = now
+                if not bucket and route in self.probing:
+                    # Until the first response says how big the bucket is, one request at a time
+                    wait = max(wait, DISCORD_RESYNC_POLL)
+                if wait <= 0:
+                    # Reserve the slot before sending so parallel workers can't oversubscribe the bucket
+                    if bucket:
+                        bucket['remaining'] -= 1
+                        return False
+                    self.probing.add(route)
+                    return True
+                self.throttled_seconds += wait
+            time.sleep(wait)
+
+    def _update(self, route, response):
+        headers = response.headers
+        if 'X-RateLimit-Limit' not in headers:
+            return
+        with self.lock:
+            if 'X-RateLimit-Bucket' in headers:
+                self.route_buckets[route] = headers['X-RateLimit-Bucket']
+            key = self._bucket_key(route)
+            now = time.monotonic()
+            # Reset-After is the time left until this bucket resets, not the length of its window
+            reset_after = float(headers.get('X-RateLimit-Reset-After', 0))
+            remaining = int(headers.get('X-RateLimit-Remaining', 0))
+            bucket = self.buckets.get(key)
+            if bucket and (bucket['reset_at'] is None or now < bucket['reset_at']):
+                # Keep slots already reserved by requests that are still in flight
+                remaining = min(remaining, bucket['remaining'])
+            self.buckets[key] = {
+                'limit': int(headers['X-RateLimit-Limit']),
+                'remaining': remaining,
+                'reset_at': now + reset_after
+            }
+
+    def _backoff(self, route, response):
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        retry_after = float(body.get('retry_after') or response.headers.get('Retry-After', 1))
+        print(f"Rate limited on {route}. Retrying in {retry_after:.2f} seconds.")
+
+        with self.lock:
+            self.rate_limited_count += 1
+            reset_at = time.monotonic() + retry_after
+            if body.get('global'):
+                self.global_reset_at = max(self.global_reset_at, reset_at)
+            else:
+                key = self._bucket_key(route)
+                bucket = self.buckets.get(key, {'limit': 1})
+                bucket.update({'remaining': 0, 'reset_at': reset_at})
+                self.buckets[key] = bucket
+
+    def get(self, route, url, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            probe = self._acquire(route)
+            try:
+                response = get_http_session().get(url, **kwargs)
+                self._update(route, response)
+            finally:
+                if probe:
+                    with self.lock:
+                        self.probing.discard(route)
+            if response.status_code != 429:
+                break
+            self._backoff(route, response)
+        return response
+
+@st.cache_resource(show_spinner=False)
+def get_discord_rate_limiter():
+    # Shared across reruns and sessions so every fetch thread sees the same buckets
+    return DiscordRateLimiter()
+
+def discord_get(route, url, headers, params=None):
+    # route is the rate-limited path with its major parameter, e.g. /channels/{id}/messages
+    return get_discord_rate_limiter().get(route, url, headers=headers, params=params)
 
 def get_server_name(guild_id, headers):
-    r_guild = requests.get(f'https://discord.com/api/v9/guilds/{guild_id}', headers=headers)
+    r_guild = discord_get(f'/guilds/{guild_id}', f'{DISCORD_API_URL}/guilds/{guild_id}', headers)
     if r_guild.status_code == 200:
         guild_data = r_guild.json()
         return guild_data.get('name', 'Unknown Server')
     else:
         print(f"Error retrieving guild information for ID {guild_id}. Status code: {r_guild.status_code}")
-        return 'Unknown Server'
-
-def retrieve_messages_from_channel(channel_id, server_name, channel_name, headers, minutes):
-    messages = []
-    oldest_message_id = None
-
-    current_time_utc = datetime.utcnow().replace(tzinfo=timezone.utc)
-    time_threshold = current_time_utc - timedelta(minutes=minutes)
+        return None
 
-    url = f'https://discord.com/api/v9/channels/{channel_id}/messages'
-    params = {'limit': 100}
+def get_guild_channels(guild_id, headers):
+    r_group = discord_get(f'/guilds/{guild_id}/channels', f'{DISCORD_API_URL}/guilds/{guild_id}/channels', headers)
+    if r_group.status_code == 200:
+        return r_group.json()
+    else:
+        print(f"Error retrieving channels for guild {guild_id}. Status code: {r_group.status_code}")
+        return None
 
-    r_channel = requests.get(url, headers=headers, params=params)
+GUILD_METADATA_TTL = 6 * 60 * 60
 
-    if r_channel.status_code == 200:
-        json_data_channel = r_channel.json()
-        if not json_data_channel:
-            print("No messages in the channel.")
-            return messages
+@st.cache_data(ttl=GUILD_METADATA_TTL, show_spinner=False)
+def get_guild_metadata(guild_id):
+    # Guild and channel names almost never change, so one lookup per guild is shared by every session
+    headers = {
+    'Authorization': access_key
+    }
+    # Raising keeps a failed lookup out of the cache
+    server_name = get_server_name(guild_id, headers)
+    if server_name is None:
+        raise RuntimeError(f"Guild information for guild {guild_id} is unavailable.")
+    channels = get_guild_channels(guild_id, headers)
+    if channels is None:
+        raise RuntimeError(f"Channel list for guild {guild_id} is unavailable.")
+    return {
+        'name': server_name,
+        'channels': {channel['id']: channel['name'] for channel in channels}
+    }
 
-        sorted_messages = sorted(json_data_channel, key=lambda x: parse_timestamp(x['timestamp']), reverse=True)
-        sorted_messages = [msg for msg in sorted_messages if parse_timestamp(msg['timestamp']) > time_threshold]
+DISCORD_EPOCH_MS = 1420070400000
+DISCORD_PAGE_SIZE = 100
+
+def datetime_to_snowflake(dt):
+    # Lowest snowflake that Discord could have generated at dt; ids compare in creation order
+    return (int(dt.timestamp() * 1000) - DISCORD_EPOCH_MS) << 22
+
+def iter_message_pages(channel_id, headers, time_threshold):
+    # Walk the channel history backwards with the `before` cursor, yielding raw pages until one
+    # reaches time_threshold. The stop check compares snowflake ids, so no timestamp is parsed here.
+    threshold_id = datetime_to_snowflake(time_threshold)
+    url = f'{DISCORD_API_URL}/channels/{channel_id}/messages'
+    params = {'limit': DISCORD_PAGE_SIZE}
+
+    while True:
+        r_channel = discord_get(f'/channels/{channel_id}/messages', url, headers, params=params)
+        if r_channel.status_code != 200:
+            print(f"Error retrieving messages from channel {channel_id}. Status code: {r_channel.status_code}")
+            return
+
+        page = r_channel.json()
+        if not page:
+            return
+        yield page
+
+        oldest_id = min(int(msg['id']) for msg in page)
+        if oldest_id <= threshold_id or len(page) < DISCORD_PAGE_SIZE:
+            return
+        params = {'limit': DISCORD_PAGE_SIZE, 'before': str(oldest_id)}
+
+def iter_new_message_pages(channel_id, headers, after_id):
+    # Walk forwards from a stored watermark with the `after` cursor
+    url = f'{DISCORD_API_URL}/channels/{channel_id}/messages'
+    params = {'limit': DISCORD_PAGE_SIZE, 'after': after_id}
+
+    while True:
+        r_channel = discord_get(f'/channels/{channel_id}/messages', url, headers, params=params)
+        if r_channel.status_code != 200:
+            print(f"Error retrieving messages from channel {channel_id}. Status code: {r_channel.status_code}")
+            return
+
+        page = r_channel.json()
+        if not page:
+            return
+        yield page
+
+        if len(page) < DISCORD_PAGE_SIZE:
+            return
+        params = {'limit': DISCORD_PAGE_SIZE, 'after': str(max(int(msg['id']) for msg in page))}
+
+DISCORD_COLUMNS = ['server', 'channel', 'author', 'original_name', 'message', 'timestamp']
+
+def normalize_message_page(page, server_name, channel_name):
+    # Flatten one raw JSON page into the output columns with column operations, not per-message appends
+    frame = pd.json_normalize(page)
+    username = frame['author.username']
+    nick = frame['author.member.nick'].fillna(username) if 'author.member.nick' in frame else username
+    attachment_url = frame['attachments'].map(lambda attachments: attachments[0]['url'] if attachments else "<Empty Message>")
+    content = frame['content'].where(frame['content'].str.strip() != "", attachment_url)
+
+    return pd.DataFrame({
+        'server': server_name,
+        'channel': channel_name,
+        'author': username,
+        'original_name': nick,
+        'message': content,
+        'timestamp': frame['timestamp'],
+        'id': frame['id'].astype('int64')
+    })
+
+def normalize_message_pages(pages, server_name, channel_name, time_threshold=None):
+    frames = [normalize_message_page(page, server_name, channel_name) for page in pages]
+    if not frames:
+        return pd.DataFrame(columns=DISCORD_COLUMNS + ['id'])
+
+    channel_df = pd.concat(frames, ignore_index=True)
+    # One vectorized parse for the whole channel; sort and filter run on the typed column
+    sent_at = pd.to_datetime(channel_df['timestamp'], utc=True, format='ISO8601')
+    if time_threshold is not None:
+        in_window = sent_at > time_threshold
+        channel_df = channel_df[in_window]
+        sent_at = sent_at[in_window]
+
+    return channel_df.loc[sent_at.sort_values(ascending=False).index]
+
+DISCORD_WATERMARKS_PATH = 'discord_watermarks.json'
 
-        if not sorted_messages:
-            print(f"No new messages within the last {minutes} minutes.")
-            return messages
+@st.cache_resource(show_spinner=False)
+def get_discord_watermarks_lock():
+    # Shared by every session so concurrent downloads don't overwrite each other's watermarks
+    return threading.Lock()
+
+def load_discord_watermarks():
+    if os.path.exists(DISCORD_WATERMARKS_PATH):
+        with open(DISCORD_WATERMARKS_PATH) as f:
+            return json.load(f)
+    return {}
+
+def save_discord_watermarks(watermarks):
+    # Merge into what is on disk, keeping the newest message ID per channel, and write through
+    # a uniquely named temp file so an interrupted run never leaves a truncated watermark file
+    with get_discord_watermarks_lock():
+        merged = load_discord_watermarks()
+        for channel_id, message_id in watermarks.items():
+            if channel_id not in merged or int(message_id) > int(merged[channel_id]):
+                merged[channel_id] = message_id
+        with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(os.path.abspath(DISCORD_WATERMARKS_PATH)), suffix='.tmp', delete=False) as f:
+            json.dump(merged, f)
+        os.replace(f.name, DISCORD_WATERMARKS_PATH)
+
+def retrieve_messages_from_channel(channel_id, server_name, channel_name, headers, minutes, after_id=None):
+    if after_id:
+        time_threshold = None
+        pages = iter_new_message_pages(channel_id, headers, after_id)
+    else:
+        current_time_utc = datetime.datetime.now(timezone.utc)
+        time_threshold = current_time_utc - timedelta(minutes=minutes)
+        pages = iter_message_pages(channel_id, headers, time_threshold)
 
-        messages.extend(sorted_messages)
-        oldest_message_id = sorted_messages[-1]['id'] if sorted_messages else oldest_message_id
+    # Pages are normalized as they arrive so only one raw page is held at a time
+    channel_df = normalize_message_pages(pages, server_name, channel_name, time_threshold)
 
-        return messages
-    else:
-        print(f"Error retrieving messages from channel {channel_id}. Status code: {r_channel.status_code}")
-        return messages
+    if channel_df.empty:
+        print(f"No new messages in channel {channel_id}.")
+        return channel_df, after_id
+    return channel_df, str(channel_df['id'].max())
 
-def download_data(minutes):
+def download_data(minutes, incremental=False):
     with st.spinner(f"Downloading data for the last {minutes} minutes..."):
-        data = {'server': [], 'channel': [], 'author': [], 'original_name': [], 'message': [], 'timestamp': []}
+        channel_frames = []
         group_channels = [
         ('884204406189490176', ['894619517441957908', '895350107137011723', '1174476193165226004', '955488909436014722', '1168298193646276671']),
         ('905908516894670928', ['1014574494502891551', '1100410569892307095', '905962797656055919', '1014989330177077370']),
@@ -164,44 +1208,69 @@ def download_data(minutes):
         headers = {
         'Authorization': access_key
         }
-
-        for group_id, channel_ids in group_channels:
-            server_name = get_server_name(group_id, headers)
-
-            r_group = requests.get(f'https://discord.com/api/v9/guilds/{group_id}/channels', headers=headers)
-            if r_group.status_code == 200:
-                json_data_group = r_group.json()
+        # Channels without a watermark yet fall back to the minutes window
+        watermarks = load_discord_watermarks()
+        rate_limiter = get_discord_rate_limiter()
+        throttled_before = rate_limiter.throttled_seconds
+        rate_limited_before = rate_limiter.rate_limited_count
+
+        with ThreadPoolExecutor(max_workers=DISCORD_MAX_WORKERS) as executor:
+            # Fan out every guild lookup at once, then every channel as soon as its guild is known
+            guild_futures = [
+                (group_id, channel_ids, executor.submit(get_guild_metadata, group_id))
+                for group_id, channel_ids in group_channels
+            ]
+
+            channel_futures = []
+            for group_id, channel_ids, metadata_future in guild_futures:
+                try:
+                    guild_metadata = metadata_future.result()
+                except RuntimeError as e:
+                    print(e)
+                    continue
+                except requests.RequestException as e:
+                    print(f"An error occurred while fetching guild {group_id}: {e}")
+                    continue
+                server_name = guild_metadata['name']
                 for channel_id in channel_ids:
-                    found_channel = next((channel for channel in json_data_group if channel['id'] == channel_id), None)
-                    if found_channel:
-                        channel_name = found_channel['name']
-                        
-                        messages = retrieve_messages_from_channel(channel_id, server_name, channel_name, headers, minutes)
-                        for message in messages:
-                            content = (message['content'] if message['content'].strip() != "" 
-                            else (message['attachments'][0]['url'] if message['attachments'] else "<Empty Message>"))
-                            data['server'].append(server_name)
-                            data['channel'].append(channel_name)
-                            data['author'].append(message['author']['username'])
-                            data['original_name'].append(message.get('author', {}).get('member', {}).get('nick', message['author']['username']))
-                            data['message'].append(content)
-                            data['timestamp'].append(message['timestamp'])
+                    channel_name = guild_metadata['channels'].get(channel_id)
+                    if channel_name:
+                        after_id = watermarks.get(channel_id) if incremental else None
+                        future = executor.submit(retrieve_messages_from_channel, channel_id, server_name, channel_name, headers, minutes, after_id)
+                        channel_futures.append((channel_id, future))
                     else:
                         print(f"Channel with ID {channel_id} not found in the group {group_id}. Skipping...")
 
-        df = pd.DataFrame(data)
+            # Collect in submission order so the DataFrame rows keep the guild/channel ordering.
+            # A channel that fails keeps its old watermark and is picked up again next time.
+            for channel_id, future in channel_futures:
+                try:
+                    channel_df, newest_id = future.result()
+                except requests.RequestException as e:
+                    print(f"An error occurred while fetching channel {channel_id}: {e}")
+                    continue
+                channel_frames.append(channel_df)
+                if newest_id:
+                    watermarks[channel_id] = newest_id
+
+        save_discord_watermarks(watermarks)
+        st.caption(
+            f"Waited {rate_limiter.throttled_seconds - throttled_before:.1f}s on Discord rate limits across all workers "
+            f"({rate_limiter.rate_limited_count - rate_limited_before} rate-limited responses)."
+        )
+
+        if not channel_frames:
+            return pd.DataFrame(columns=DISCORD_COLUMNS)
+        df = pd.concat(channel_frames, ignore_index=True)[DISCORD_COLUMNS]
         return df
     
 def fetch_data_from_database(minutes):
     with st.spinner(f"Fetching data for the last {minutes} minutes from the database..."):
-        # db_connection_string = os.getenv("DATABASE_URL")
-        db_connection_string = st.secrets["DATABASE_URL"]
         sql_query = f"SELECT * FROM discord_data WHERE time_stamp > NOW() - INTERVAL '{minutes} minutes'"
 
         try:
-            conn = psycopg2.connect(db_connection_string)
-
-            df_database = pd.read_sql_query(sql_query, conn)
+            with get_database_pool().connection() as conn:
+                df_database = pd.read_sql_query(sql_query, conn)
 
             return df_database
 
@@ -209,96 +1278,83 @@ def fetch_data_from_database(minutes):
             print(f"An error occurred: {e}")
             return pd.DataFrame()
 
-        finally:
-            if conn:
-                conn.close()
-
     
-def scrape_article_info(url):
-    with st.spinner("Scraping data..."):
-        driver = webdriver.Chrome(service=get_webdriver_service(), options=get_webdriver_options())
-        driver.get(url)  
-        driver.implicitly_wait(5)
-
-        # Extract article name
-        article_name_element = driver.find_elements(By.TAG_NAME, 'h1')
-        article_name = article_name_element[0].text.strip()
-
-        # Extract article date
-        # time_element = driver.find_element(By.XPATH, "//time[@datetime]")
-        wait = WebDriverWait(driver, 10)  # Adjust the timeout as needed
-        time_element = wait.until(EC.presence_of_element_located((By.XPATH, "//time[@datetime]")))
-        article_date = time_element.text.strip()
-
-        # Extract image URL
-        div_element_image = driver.find_element(By.XPATH, "//div[contains(@class, 'gg-dark:p-1')]")
-        img_element = div_element_image.find_element(By.TAG_NAME, 'img')
-        img_url = img_element.get_attribute('src')
-
-        # Try the first XPath for article content
-        try:
-            div_element = driver.find_element(By.XPATH, "//div[contains(@class, 'grid grid-cols-1 md:grid-cols-8 unreset post-content md:pb-20')]")
-            p_elements = div_element.find_elements(By.XPATH, ".//p[contains(@class, 'font-meta-serif-pro scene:font-noto-sans scene:text-base scene:md:text-lg font-normal text-lg md:text-xl md:leading-9 tracking-px text-body gg-dark:text-neutral-100')]")
-            article_content = '\n'.join([p.text.strip() for p in p_elements])
-        except NoSuchElementException:
-            # If the first XPath fails, try the second XPath
-            try:
-                div_element = driver.find_element(By.XPATH, "//span[contains(text())]")
-                p_elements = div_element.find_elements(By.XPATH, ".//p")
-                article_content = '\n'.join([p.text.strip() for p in p_elements])
-            except NoSuchElementException:
-                article_content = "Unable to extract article content"
-
-        driver.quit()
-
-        return article_name, article_date, img_url, article_content
+YOUTUBE_BATCH_SIZE = 50  # most IDs channels().list / videos().list accept per call
 
+@st.cache_resource(show_spinner=False)
+def get_youtube_client(api_key):
+    # One parsed service per API key for the whole process, shared by every session.
+    # The discovery document ships with the library, so nothing is fetched or written to disk.
+    # Its own HTTP object is never used: requests are executed with get_youtube_http().
+    return googleapiclient.discovery.build("youtube", "v3", developerKey=api_key, static_discovery=True, cache_discovery=False)
 
-def get_channel_info(api_key, channel_id):
-    api_service_name = "youtube"
-    api_version = "v3"
-
-    youtube = googleapiclient.discovery.build(api_service_name, api_version, developerKey=api_key)
+@st.cache_resource(show_spinner=False)
+def get_youtube_http_local():
+    return threading.local()
 
-    request = youtube.channels().list(
-        part="snippet,contentDetails,statistics",
-        id=channel_id
-    )
+def get_youtube_http():
+    # httplib2.Http isn't thread-safe, so every script thread keeps its own connection
+    local = get_youtube_http_local()
+    if not hasattr(local, 'http'):
+        local.http = httplib2.Http(timeout=30)
+    return local.http
 
+@st.cache_resource(show_spinner=False)
+def get_youtube_quota():
+    # Data API quota units spent by this process; every list call costs 1, a 304 costs nothing
+    return {'units': 0}
+
+def execute_youtube_request(request, etag=None):
+    # Returns the response, or None when etag still matches (304)
+    if etag:
+        request.headers['If-None-Match'] = etag
     try:
-        response = request.execute()
-        return response
-    except Exception as e:
-        print(f"An error occurred: {e}")
-        return None
-
-
-def get_latest_videos(api_key, channel_id, max_results=5):
-    api_service_name = "youtube"
-    api_version = "v3"
+        response = request.execute(http=get_youtube_http())
+    except HttpError as e:
+        if etag and e.resp.status == 304:
+            return None
+        get_youtube_quota()['units'] += 1
+        raise
+    get_youtube_quota()['units'] += 1
+    return response
+
+def chunked(items, size):
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def get_channels_info(api_key, channel_ids):
+    # One channels().list call per 50 channels; returns {channel_id: item}
+    youtube = get_youtube_client(api_key)
+
+    channels = {}
+    for batch in chunked(channel_ids, YOUTUBE_BATCH_SIZE):
+        request = youtube.channels().list(
+            part="snippet,contentDetails,statistics",
+            id=','.join(batch),
+            maxResults=YOUTUBE_BATCH_SIZE
+        )
+        try:
+            response = execute_youtube_request(request)
+            channels.update({item['id']: item for item in response.get('items', [])})
+        except Exception as e:
+            print(f"An error occurred: {e}")
+    return channels
 
-    youtube = googleapiclient.discovery.build(api_service_name, api_version, developerKey=api_key)
 
-    request = youtube.channels().list(
-        part="contentDetails",
-        id=channel_id
-    )
+def get_latest_videos(api_key, uploads_playlist_id, max_results=5, etag=None):
+    # Returns the playlistItems response, or None if it is unchanged since etag or the call failed
+    youtube = get_youtube_client(api_key)
 
     try:
-        response = request.execute()
-        uploads_playlist_id = response['items'][0]['contentDetails']['relatedPlaylists']['uploads']
-
         request = youtube.playlistItems().list(
             part="snippet",
             playlistId=uploads_playlist_id,
             maxResults=max_results
         )
 
-        response = request.execute()
-        return response.get("items", [])
+        return execute_youtube_request(request, etag)
     except Exception as e:
         print(f"An error occurred: {e}")
-        return []
+        return None
 
 
 def get_english_subtitles(video_id):
@@ -309,29 +1365,101 @@ def get_english_subtitles(video_id):
         print(f"An error occurred while fetching English subtitles: {e}")
         return []
 
-def get_youtuber_info(api_key, channel_id):
-    channel_info = get_channel_info(api_key, channel_id)
-    if channel_info:
-        return {
-            'id': channel_info['items'][0]['id'],
-            'title': channel_info['items'][0]['snippet']['title'],
-            'subscriber_count': channel_info['items'][0]['statistics']['subscriberCount']
-        }
-    else:
-        return None
+TRANSCRIPT_STORE_PATH = os.getenv('TRANSCRIPT_STORE_PATH', 'transcripts.sqlite3')
+TRANSCRIPT_MAX_WORKERS = int(os.getenv('TRANSCRIPT_MAX_WORKERS', 4))
+TRANSCRIPT_RETRY_AFTER = 6 * 60 * 60  # videos without English subtitles are asked again after this long
+
+class TranscriptStore:
+    # English transcript segments ({text, start, duration}) per video ID as zlib-compressed JSON.
+    # Published transcripts don't change, so only the empty results of failed lookups expire.
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS transcripts ("
+            "video_id TEXT PRIMARY KEY, segments BLOB NOT NULL, empty INTEGER NOT NULL, fetched_at REAL NOT NULL)"
+        )
+        self.conn.commit()
+
+    def get_many(self, video_ids):
+        # Returns {video_id: segments} for every stored video, [] where no subtitles were found
+        placeholders = ', '.join('?' for _ in video_ids)
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT video_id, segments FROM transcripts WHERE video_id IN ({placeholders})", video_ids
+            ).fetchall() if video_ids else []
+        return {video_id: json.loads(zlib.decompress(segments)) for video_id, segments in rows}
+
+    def missing(self, video_ids):
+        placeholders = ', '.join('?' for _ in video_ids)
+        with self.lock:
+            stored = {row[0] for row in self.conn.execute(
+                f"SELECT video_id FROM transcripts WHERE video_id IN ({placeholders}) AND (empty = 0 OR fetched_at >= ?)",
+                [*video_ids, time.time() - TRANSCRIPT_RETRY_AFTER]
+            )} if video_ids else set()
+        return [video_id for video_id in dict.fromkeys(video_ids) if video_id not in stored]
+
+    def put(self, video_id, segments):
+        data = zlib.compress(json.dumps(segments).encode('utf-8'))
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO transcripts (video_id, segments, empty, fetched_at) VALUES (?, ?, ?, ?)",
+                (video_id, data, 0 if segments else 1, time.time())
+            )
+            self.conn.commit()
+
+@st.cache_resource(show_spinner=False)
+def get_transcript_store():
+    return TranscriptStore(TRANSCRIPT_STORE_PATH)
+
+def fill_transcript_store(video_ids, max_workers=TRANSCRIPT_MAX_WORKERS):
+    # Download only the transcripts the store doesn't have yet, a few at a time
+    store = get_transcript_store()
+    missing = store.missing(video_ids)
+    if missing:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for video_id, segments in zip(missing, executor.map(get_english_subtitles, missing)):
+                store.put(video_id, segments)
+    return len(missing)
+
+def get_videos_info(api_key, video_ids):
+    # One videos().list call per 50 videos; returns {video_id: item}
+    youtube = get_youtube_client(api_key)
+
+    videos = {}
+    for batch in chunked(video_ids, YOUTUBE_BATCH_SIZE):
+        request = youtube.videos().list(
+            part="snippet,contentDetails,statistics",
+            id=','.join(batch),
+            maxResults=YOUTUBE_BATCH_SIZE
+        )
+        try:
+            response = execute_youtube_request(request)
+            videos.update({item['id']: item for item in response.get('items', [])})
+        except Exception as e:
+            print(f"An error occurred: {e}")
+    return videos
 
-def fetch_video_details(video_url, developer_key, channel_id):
+ISO8601_DURATION_PATTERN = re.compile(r'P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?')
+
+def parse_iso8601_duration(duration):
+    # contentDetails.duration looks like PT1H2M3S (or P1DT2H for very long streams); returns seconds
+    match = ISO8601_DURATION_PATTERN.fullmatch(duration or '')
+    if not match:
+        return 0
+    weeks, days, hours, minutes, seconds = (int(part) if part else 0 for part in match.groups())
+    return (((weeks * 7 + days) * 24 + hours) * 60 + minutes) * 60 + seconds
+
+def display_video_details(video, youtuber_name, segments):
     try:
-        yt = YouTube(video_url)
-        subtitles = get_subtitles_string(yt.video_id)
-        youtuber_info = get_youtuber_info(developer_key, channel_id)
+        subtitles = get_subtitles_string(segments)
         st.subheader("\nVideo Details:")
-        st.write(f"Video URL: {yt.watch_url}")
-        st.write(f"Title: {yt.title}")
-        st.write(f"YouTuber Name: {youtuber_info['title']}")
-        st.write(f"Published At: {yt.publish_date}")
-        st.write(f"Duration: {yt.length} seconds")
-        st.write(f"Views: {yt.views}")
+        st.write(f"Video URL: https://www.youtube.com/watch?v={video['id']}")
+        st.write(f"Title: {video['snippet']['title']}")
+        st.write(f"YouTuber Name: {youtuber_name}")
+        st.write(f"Published At: {video['snippet']['publishedAt']}")
+        st.write(f"Duration: {parse_iso8601_duration(video['contentDetails'].get('duration'))} seconds")
+        st.write(f"Views: {video['statistics'].get('viewCount', 'N/A')}")
         st.subheader("Transcript")
         # st.write(subtitles)
         if subtitles:
@@ -342,85 +1470,293 @@ def fetch_video_details(video_url, developer_key, channel_id):
     except Exception as e:
         print(f"An error occurred: {e}")
 
-def get_subtitles_string(video_id):
-    subtitles = get_english_subtitles(video_id)
-    if subtitles:
+def get_subtitles_string(segments):
+    if segments:
         # Concatenate subtitles into a string
-        return '\n'.join(entry['text'] for entry in subtitles)
+        return '\n'.join(entry['text'] for entry in segments)
     else:
         return "No English subtitles found."
 
-def scrape_and_display_article(url):
-    response = requests.get(url)
-    article_soup = BeautifulSoup(response.text, 'html.parser')
-
-    article_name_element = article_soup.find('h1', class_="typography__StyledTypography-sc-owin6q-0 bSOJsQ")
-    if article_name_element:
-        article_name = article_name_element.text.strip()
-        st.write(f'# {article_name}')
-
-        main_div = article_soup.find('div', class_='featured-imagestyles__FeaturedImageWrapper-sc-ojmof1-0 jGviVP at-rail-aligner at-rail-aligner-fi')
-        if not main_div:
-            main_div = article_soup.find('div', class_='featured-imagestyles__FeaturedImageWrapper-sc-ojmof1-0 jGviVP featured-media featured-media-fi')
-
-        if main_div:
-            picture_tag = main_div.find('picture', class_='responsive-picturestyles__ResponsivePictureWrapper-sc-1urqrom-0 iLCXlQ')
-            if picture_tag:
-                img_tag = picture_tag.find('img')
-                if img_tag:
-                    image_url = img_tag['src']
-                    st.image(image_url, caption='Article Image', use_column_width=True)
-                else:
-                    st.write('Img tag not found within picture tag.')
-            else:
-                st.write('Picture tag not found within main div.')
-        else:
-            st.write('Image not in article.')
+YOUTUBE_LATEST_VIDEOS = 5  # uploads listed per channel, the most the YouTube tab shows
+YOUTUBE_VIDEO_STATS_TTL = 60 * 60  # seconds before a listed video's view count is looked up again
+
+class YouTubeChannelStore:
+    # Channel titles and uploads playlists (which never change), each playlist's last ETag and
+    # video IDs, and video metadata with when it was fetched, kept next to the transcripts
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS youtube_channels ("
+            "channel_id TEXT PRIMARY KEY, title TEXT NOT NULL, uploads_playlist_id TEXT NOT NULL, "
+            "etag TEXT, video_ids TEXT NOT NULL DEFAULT '[]')"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS youtube_videos ("
+            "video_id TEXT PRIMARY KEY, item BLOB NOT NULL, fetched_at REAL NOT NULL DEFAULT 0)"
+        )
+        # Stores created before fetched_at was tracked; their rows count as stale
+        if 'fetched_at' not in [column[1] for column in self.conn.execute("PRAGMA table_info(youtube_videos)")]:
+            self.conn.execute("ALTER TABLE youtube_videos ADD COLUMN fetched_at REAL NOT NULL DEFAULT 0")
+        self.conn.commit()
+
+    def get_channels(self, channel_ids):
+        placeholders = ', '.join('?' for _ in channel_ids)
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT channel_id, title, uploads_playlist_id, etag, video_ids FROM youtube_channels WHERE channel_id IN ({placeholders})",
+                channel_ids
+            ).fetchall() if channel_ids else []
+        channels = {
+            channel_id: {'title': title, 'uploads_playlist_id': uploads_playlist_id, 'etag': etag, 'video_ids': json.loads(video_ids)}
+            for channel_id, title, uploads_playlist_id, etag, video_ids in rows
+        }
+        # Keep the caller's channel order
+        return {channel_id: channels[channel_id] for channel_id in channel_ids if channel_id in channels}
+
+    def put_channel(self, channel_id, title, uploads_playlist_id):
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO youtube_channels (channel_id, title, uploads_playlist_id) VALUES (?, ?, ?)",
+                (channel_id, title, uploads_playlist_id)
+            )
+            self.conn.commit()
+
+    def update_uploads(self, channel_id, etag, video_ids):
+        with self.lock:
+            self.conn.execute(
+                "UPDATE youtube_channels SET etag = ?, video_ids = ? WHERE channel_id = ?",
+                (etag, json.dumps(video_ids), channel_id)
+            )
+            self.conn.commit()
+
+    def get_videos(self, video_ids):
+        placeholders = ', '.join('?' for _ in video_ids)
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT video_id, item FROM youtube_videos WHERE video_id IN ({placeholders})", video_ids
+            ).fetchall() if video_ids else []
+        return {video_id: json.loads(zlib.decompress(item)) for video_id, item in rows}
+
+    def stale_videos(self, video_ids, ttl=YOUTUBE_VIDEO_STATS_TTL):
+        # IDs with no metadata yet or metadata (and so statistics) older than ttl
+        placeholders = ', '.join('?' for _ in video_ids)
+        with self.lock:
+            fresh = {row[0] for row in self.conn.execute(
+                f"SELECT video_id FROM youtube_videos WHERE video_id IN ({placeholders}) AND fetched_at >= ?",
+                [*video_ids, time.time() - ttl]
+            )} if video_ids else set()
+        return [video_id for video_id in dict.fromkeys(video_ids) if video_id not in fresh]
+
+    def put_videos(self, videos):
+        now = time.time()
+        with self.lock:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO youtube_videos (video_id, item, fetched_at) VALUES (?, ?, ?)",
+                [(video_id, zlib.compress(json.dumps(item).encode('utf-8')), now) for video_id, item in videos.items()]
+            )
+            self.conn.commit()
 
-        date_time_div = article_soup.find('div', class_="at-created label-with-icon")
-        if not date_time_div:
-            date_time_div = article_soup.find('div', class_="align-right")
+@st.cache_resource(show_spinner=False)
+def get_youtube_channel_store():
+    return YouTubeChannelStore(TRANSCRIPT_STORE_PATH)
+
+def poll_youtube_channels(api_key, channel_ids):
+    # Channels are looked up once; after that each poll re-lists every uploads playlist with its
+    # stored ETag, so a channel with nothing new costs a 304 and no quota. Only videos never seen
+    # before, or whose statistics are older than YOUTUBE_VIDEO_STATS_TTL, go to videos().list.
+    # Returns ({channel_id: {title, uploads_playlist_id, etag, video_ids}}, IDs new since the last poll)
+    store = get_youtube_channel_store()
+    unknown = [channel_id for channel_id in channel_ids if channel_id not in store.get_channels(channel_ids)]
+    if unknown:
+        for channel_id, item in get_channels_info(api_key, unknown).items():
+            store.put_channel(channel_id, item['snippet']['title'], item['contentDetails']['relatedPlaylists']['uploads'])
+
+    channels = store.get_channels(channel_ids)
+    for channel_id in channel_ids:
+        if channel_id not in channels:
+            print(f"Channel {channel_id} not found.")
+    new_video_ids = []
+    for channel_id, channel in channels.items():
+        response = get_latest_videos(api_key, channel['uploads_playlist_id'], YOUTUBE_LATEST_VIDEOS, channel['etag'])
+        if response is None:
+            continue
+        video_ids = [video['snippet']['resourceId']['videoId'] for video in response.get('items', [])]
+        new_video_ids += [video_id for video_id in video_ids if video_id not in channel['video_ids']]
+        store.update_uploads(channel_id, response.get('etag'), video_ids)
+        channel['video_ids'] = video_ids
+
+    listed = [video_id for channel in channels.values() for video_id in channel['video_ids']]
+    stale = store.stale_videos(listed)
+    if stale:
+        store.put_videos(get_videos_info(api_key, stale))
+    return channels, new_video_ids
+
+DB_POOL_MIN_CONNECTIONS = int(os.getenv('DB_POOL_MIN_CONNECTIONS', 1))
+DB_POOL_MAX_CONNECTIONS = int(os.getenv('DB_POOL_MAX_CONNECTIONS', 5))
+DB_POOL_CHECKOUT_TIMEOUT = 30
+DB_POOL_HEALTH_CHECK_AFTER = 60  # seconds a connection may sit idle before it is pinged on checkout
+
+class DatabasePool:
+    # ThreadedConnectionPool raises PoolError as soon as maxconn connections are out, so a
+    # semaphore makes callers queue for a free one instead. Connections idle for a while are
+    # pinged before use and replaced if the server dropped them.
+    def __init__(self, dsn, min_connections, max_connections, checkout_timeout=DB_POOL_CHECKOUT_TIMEOUT):
+        self.pool = ThreadedConnectionPool(min_connections, max_connections, dsn, sslmode='require')
+        self.slots = threading.BoundedSemaphore(max_connections)
+        self.checkout_timeout = checkout_timeout
+        self.lock = threading.Lock()
+        self.last_used = {}
+        self.checkouts = 0
+        self.reconnects = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _is_healthy(self, conn):
+        if conn.closed:
+            return False
+        if time.monotonic() - self.last_used.get(id(conn), 0) < DB_POOL_HEALTH_CHECK_AFTER:
+            return True
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except psycopg2.Error:
+            return False
+
+    def _checkout(self):
+        # After a database restart every idle connection is dead, so keep discarding until one
+        # passes; once maxconn have been thrown away the pool has to open a new one
+        conn = self.pool.getconn()
+        for _ in range(self.pool.maxconn):
+            if self._is_healthy(conn):
+                break
+            self.last_used.pop(id(conn), None)
+            self.pool.putconn(conn, close=True)
+            conn = self.pool.getconn()
+            with self.lock:
+                self.reconnects += 1
+        return conn
 
-        if date_time_div:
-            date_time_span = date_time_div.find('span', class_="typography__StyledTypography-sc-owin6q-0 hcIsFR")
-            date_time_text = date_time_span.text.strip()
-            st.write(f'## Date and Time\n{date_time_text}')
-        else:
-            st.write('Date and Time not found')
-
-        divs = article_soup.find_all('div', class_=["common-textstyles__StyledWrapper-sc-18pd49k-0 eSbCkN"])
-        for div in divs:
-            p_tags = div.find_all('p')
-            for p_tag in p_tags:
-                p_text = p_tag.text.strip()
-                st.markdown(f'{p_text}\n\n')
-    else:
-        st.write('Article Name not found. Moving to the next article.\n')
+    @contextmanager
+    def connection(self):
+        # Uncommitted work is rolled back when the connection goes back to the pool
+        start = time.perf_counter()
+        if not self.slots.acquire(timeout=self.checkout_timeout):
+            raise TimeoutError(f"No database connection free after {self.checkout_timeout}s")
+        try:
+            conn = self._checkout()
+        except Exception:
+            self.slots.release()
+            raise
+        waited = time.perf_counter() - start
+        with self.lock:
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
 
-def connect_to_database():
+        try:
+            yield conn
+        finally:
+            broken = bool(conn.closed)
+            if not broken:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+            if broken:
+                self.last_used.pop(id(conn), None)
+            else:
+                self.last_used[id(conn)] = time.monotonic()
+            self.pool.putconn(conn, close=broken)
+            self.slots.release()
+
+    def stats(self):
+        with self.lock:
+            return {
+                'checkouts': self.checkouts,
+                'reconnects': self.reconnects,
+                'avg_wait_ms': self.total_wait / self.checkouts * 1000 if self.checkouts else 0.0,
+                'max_wait_ms': self.max_wait * 1000,
+                'max_connections': self.pool.maxconn,
+            }
+
+@st.cache_resource(show_spinner=False)
+def get_database_pool():
     # DATABASE_URL = os.getenv("DATABASE_URL")
-    DATABASE_URL = st.secrets["DATABASE_URL"]
-    conn = psycopg2.connect(DATABASE_URL, sslmode='require')
-    return conn
-
-def get_tweets_last_day(conn):
-    yesterday = datetime.now() - timedelta(days=1)
-    yesterday_str = yesterday.strftime("%Y-%m-%d")
-    query = f"SELECT * FROM twitter_data WHERE time_stamp >= '{yesterday_str}'"
-    cur = conn.cursor()
-    cur.execute(query)
-    return cur.fetchall(), yesterday_str
-
-def calculate_stats(tweets):
-    stats = {}
-    for tweet in tweets:
-        channel = tweet[1]  # Assuming the channel is stored in the second column
-        print(tweet[1])
-        if channel in stats:
-            stats[channel] += 1
-        else:
-            stats[channel] = 1
-    return stats
+    return DatabasePool(st.secrets["DATABASE_URL"], DB_POOL_MIN_CONNECTIONS, DB_POOL_MAX_CONNECTIONS)
+
+TWITTER_ROLLUP_BACKFILL_DAYS = 30  # history the rollup starts with, and the longest histogram
+TWITTER_ROLLUP_RECOUNT_DAYS = 2  # trailing days recounted on every refresh to pick up late rows
+TWITTER_ROLLUP_REFRESH_INTERVAL = 5 * 60  # seconds between refreshes, shared by every session
+
+@st.cache_resource(show_spinner=False)
+def get_twitter_rollup_state():
+    return {'refreshed_at': None, 'lock': threading.Lock()}
+
+def get_tweet_counts(conn, since):
+    # Per-channel tweet counts since a date, counted by Postgres instead of shipping every row
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT data_source, COUNT(*) FROM twitter_data WHERE time_stamp >= %s GROUP BY data_source ORDER BY data_source",
+            (since,)
+        )
+        return dict(cur.fetchall())
+
+def get_tweets_since(conn, since):
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT id, data_source, tweet_text, time_stamp FROM twitter_data WHERE time_stamp >= %s ORDER BY time_stamp",
+            (since,)
+        )
+        return pd.DataFrame(cur.fetchall(), columns=['id', 'data_source', 'tweet_text', 'time_stamp'])
+
+def refresh_twitter_daily_rollup(conn):
+    # Per-day, per-channel counts. Each refresh recounts the last few days, so tweets stored late
+    # with earlier timestamps are still counted, or everything since the newest rolled-up day if
+    # that is older; the first refresh backfills. Runs at most once per refresh interval.
+    state = get_twitter_rollup_state()
+    with state['lock']:
+        # Claim the refresh before running it so sessions arriving together don't both upsert
+        last_refreshed_at = state['refreshed_at']
+        if last_refreshed_at is not None and time.monotonic() - last_refreshed_at < TWITTER_ROLLUP_REFRESH_INTERVAL:
+            return
+        state['refreshed_at'] = time.monotonic()
+    backfill_from = (datetime.datetime.now() - timedelta(days=TWITTER_ROLLUP_BACKFILL_DAYS)).strftime("%Y-%m-%d")
+    try:
+        with conn.cursor() as cur:
+            cur.execute(
+                "CREATE TABLE IF NOT EXISTS twitter_daily_rollup ("
+                "day DATE NOT NULL, data_source TEXT NOT NULL, tweet_count INTEGER NOT NULL, "
+                "PRIMARY KEY (day, data_source))"
+            )
+            cur.execute(
+                "INSERT INTO twitter_daily_rollup (day, data_source, tweet_count) "
+                "SELECT time_stamp::date, data_source, COUNT(*) FROM twitter_data "
+                "WHERE time_stamp >= LEAST(COALESCE((SELECT MAX(day) FROM twitter_daily_rollup), %s::date), CURRENT_DATE - %s) "
+                "GROUP BY 1, 2 "
+                "ON CONFLICT (day, data_source) DO UPDATE SET tweet_count = EXCLUDED.tweet_count",
+                (backfill_from, TWITTER_ROLLUP_RECOUNT_DAYS)
+            )
+        conn.commit()
+    except Exception:
+        # Give the claim back so the next rerun tries again
+        with state['lock']:
+            state['refreshed_at'] = last_refreshed_at
+        raise
+
+def get_daily_tweet_counts(conn, days):
+    # Day x channel table of tweet counts over the last `days` days, read from the rollup
+    since = (datetime.datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+    with conn.cursor() as cur:
+        cur.execute(
+            "SELECT day, data_source, tweet_count FROM twitter_daily_rollup WHERE day >= %s ORDER BY day",
+            (since,)
+        )
+        rows = cur.fetchall()
+    df = pd.DataFrame(rows, columns=['day', 'data_source', 'tweet_count'])
+    return df.pivot_table(index='day', columns='data_source', values='tweet_count', fill_value=0)
 
 
 # Function to run code for Tab 1
@@ -439,16 +1775,13 @@ def calculate_stats(tweets):
 #         st.success(f"Data saved to {excel_filename}")
 
 def fetch_data_coin(symbol):
-    # conn_string = os.getenv("DATABASE_URL")
-    conn_string = st.secrets["DATABASE_URL"]
-    conn = psycopg2.connect(conn_string)
-    cursor = conn.cursor()
-    query = f"SELECT timestamp, price, circulating_supply FROM coinmarket_historical_data WHERE symbol = '{symbol}'"
-    cursor.execute(query)
-    data = cursor.fetchall()
+    with get_database_pool().connection() as conn:
+        cursor = conn.cursor()
+        query = "SELECT timestamp, price, circulating_supply FROM coinmarket_historical_data WHERE symbol = %s"
+        cursor.execute(query, (symbol,))
+        data = cursor.fetchall()
     columns = ["timestamp", "price", "circulating_supply"]
     df = pd.DataFrame(data, columns=columns)
-    conn.close()
     return df 
 
 def plot_line_graph(df, frequency):
@@ -516,32 +1849,25 @@ def find_coin_name(df, symbol):
     return coin_keys if coin_keys else ["Ticker not found."]
 
 def fetch_data_from_skynet(coin_id):
-    # Define your Heroku PostgreSQL connection string
-    # DATABASE_URL = os.getenv("DATABASE_URL")
-    DATABASE_URL = st.secrets["DATABASE_URL"]
-
-    # Connect to the PostgreSQL database
-    conn = psycopg2.connect(DATABASE_URL)
-
-    # Create a cursor object to execute SQL queries
-    cur = conn.cursor()
+    # Borrow a connection from the shared Heroku PostgreSQL pool
+    with get_database_pool().connection() as conn:
+        # Create a cursor object to execute SQL queries
+        cur = conn.cursor()
 
-    # Execute the SQL query to fetch data for the specified coin_id
-    cur.execute("SELECT * FROM skynet_data WHERE coin_id = %s", (coin_id,))
+        # Execute the SQL query to fetch data for the specified coin_id
+        cur.execute("SELECT * FROM skynet_data WHERE coin_id = %s", (coin_id,))
 
-    # Fetch all the rows
-    data = cur.fetchone()
+        # Fetch all the rows
+        data = cur.fetchone()
 
-    colnames = [desc[0] for desc in cur.description]
+        colnames = [desc[0] for desc in cur.description]
 
-    # Close the cursor and connection
-    cur.close()
-    conn.close()
+        cur.close()
 
     return colnames, data
 
 def fetch_dataa(url):
-    response = requests.get(url)
+    response = get_http_session().get(url)
     data = response.json()
     return data
 
@@ -601,7 +1927,7 @@ def fetch_historical_data(symbol):
     }
 
     # Send the request
-    response = requests.get(url, params=params, headers=headers)
+    response = get_http_session().get(url, params=params, headers=headers)
 
     # Check if the request was successful
     if response.status_code == 200:
@@ -969,7 +2295,7 @@ def fetch_coin_data_coinmarket(api_key, limit=5000):
     headers = {
         "X-CMC_PRO_API_KEY": api_key
     }
-    response = requests.get(url, headers=headers)
+    response = get_http_session().get(url, headers=headers)
     if response.status_code == 200:
         return response.json()['data']
     else:
@@ -982,13 +2308,21 @@ def run_tab1():
 
     # Button to download data from Discord channels
     minutes_download = st.number_input("Enter the number of minutes to retrieve data from Discord channels:", value=30, min_value=1)
+    incremental = st.checkbox("Only fetch messages newer than the last download")
     if st.button("Download Data from Discord Channels"):
-        df_download = download_data(minutes_download)
+        df_download = download_data(minutes_download, incremental=incremental)
+        excel_filename_download = "discord_data_download.xlsx"
+
+        if incremental:
+            st.write(f"Downloaded {len(df_download)} new messages from Discord channels.")
+            # Append the new messages to the previously saved dataset
+            if os.path.exists(excel_filename_download):
+                df_download = pd.concat([pd.read_excel(excel_filename_download), df_download], ignore_index=True)
+
         st.write("Downloaded data from Discord channels:")
         st.write(df_download)
 
         # Save data to Excel
-        excel_filename_download = "discord_data_download.xlsx"
         df_download.to_excel(excel_filename_download, index=False)
         st.success(f"Data saved to {excel_filename_download}")
 
@@ -1005,178 +2339,10 @@ def run_tab1():
     #     st.success(f"Data fetched from the database and saved to {excel_filename_db}")
         
 def run_tab2():
-    st.title("Article Information")
-    num_articles = st.number_input("Enter the number of articles to retrieve:", value=1, min_value=1, step=1)
-
-    base_url = 'https://decrypt.co/news'
-    response = requests.get(base_url)
-    soup = BeautifulSoup(response.text, 'html.parser')
-    first_containers = soup.find_all('div', class_='mt-2 md:col-span-4 md:mt-0')
-    second_containers = soup.find_all('h3', class_="font-medium xl:font-normal mt-1 font-akzidenz-grotesk text-black gg-dark:text-neutral-100 gg-dark:font-poppins scene:font-itc-avant-garde-gothic-pro scene:font-medium scene:mt-2 degen-alley-dark:text-white text-base leading-4.5 xl:text-xl xl:leading-6")
-    third_containers = soup.find_all('h3', class_="font-medium mt-1 font-akzidenz-grotesk text-black gg-dark:text-neutral-100 gg-dark:font-poppins scene:font-itc-avant-garde-gothic-pro scene:font-medium scene:mt-2 degen-alley-dark:text-white text-base leading-4.5 xl:text-xl xl:leading-6")
-    article_containers = soup.find_all('div', class_='mb-5 pb-5 last-of-type:mb-0')
-
-    total_articles_displayed = 0  # Track the total number of articles displayed
-
-    for fisrt in first_containers:
-        if total_articles_displayed >= num_articles:
-            break
-
-        first_links = fisrt.find('a', class_='linkbox__overlay')
-        if first_links:
-            hrefs = first_links.get('href')
-            full_url = f"https://decrypt.co{hrefs}"
-
-            article_name, article_date, img_url, article_content = scrape_article_info(full_url)
-
-            # Display article information in a tabular form
-            st.markdown(f"# {article_name}")
-            st.write(f"**Date:** {article_date}")
-            st.image(img_url, caption="Image", use_column_width=True)
-            st.write("### Article Content:")
-            st.write(article_content)
-
-            st.markdown("---") 
-            total_articles_displayed += 1
-
-    for second in second_containers:
-        if total_articles_displayed >= num_articles:
-            break
-
-        second_links = second.find('a', class_="linkbox__overlay")
-        if second_links:
-            hrefs2 = second_links.get('href')
-            full_url = f"https://decrypt.co{hrefs2}"
-
-            article_name, article_date, img_url, article_content = scrape_article_info(full_url)
-
-            # Display article information in a tabular form
-            st.markdown(f"# {article_name}")
-            st.write(f"**Date:** {article_date}")
-            st.image(img_url, caption="Image", use_column_width=True)
-            st.write("### Article Content:")
-            st.write(article_content)
-
-            st.markdown("---") 
-            total_articles_displayed += 1
-
-    for third in third_containers:
-        if total_articles_displayed >= num_articles:
-            break
-
-        third_links = third.find('a', class_="linkbox__overlay")
-        if third_links:
-            hrefs3 = third_links.get('href')
-            full_url = f"https://decrypt.co{hrefs3}"
-
-            article_name, article_date, img_url, article_content = scrape_article_info(full_url)
-
-            # Display article information in a tabular form
-            st.markdown(f"# {article_name}")
-            st.write(f"**Date:** {article_date}")
-            st.image(img_url, caption="Image", use_column_width=True)
-            st.write("### Article Content:")
-            st.write(article_content)
-
-            st.markdown("---") 
-            total_articles_displayed += 1
-
-    for container in article_containers:
-        if total_articles_displayed >= num_articles:
-            break
-
-        link = container.find('a', class_='linkbox__overlay')
-        if link:
-            href = link.get('href')
-            full_url = f"https://decrypt.co/{href}"
-
-            article_name, article_date, img_url, article_content = scrape_article_info(full_url)
-
-            # Display article information in a tabular form
-            st.markdown(f"# {article_name}")
-            st.write(f"**Date:** {article_date}")
-            st.image(img_url, caption="Image", use_column_width=True)
-            st.write("### Article Content:")
-            st.write(article_content)
-
-            st.markdown("---") 
-            total_articles_displayed += 1
-
+    run_news_site_tab('decrypt', "Tab 2: Decrypt News")
 
 def run_tab3():
-    st.subheader("Tab 3: Coin Desk News")
-    num_articles = st.number_input("Enter the number of articles to retrieve:", value=1, min_value=1, step=1)
-
-    with st.spinner("Scraping data..."):
-        base_url = 'https://www.coindesk.com/tag/news/'
-        response = requests.get(base_url)
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        h6_tags = soup.find_all('h6', class_="typography__StyledTypography-sc-owin6q-0 diMXjy")
-
-        for i, h6_tag in enumerate(h6_tags[:num_articles]):
-            link = h6_tag.find('a', class_="card-title")
-
-            if link:
-                href = link.get('href')
-                full_url = f'https://www.coindesk.com/{href}'
-                response = requests.get(full_url)
-                article_soup = BeautifulSoup(response.text, 'html.parser')
-
-                article_name_element = article_soup.find('h1', class_="typography__StyledTypography-sc-owin6q-0 bSOJsQ")
-
-                if article_name_element:
-                    article_name = article_name_element.text.strip()
-                    st.write(f'# {i+1}. Article Name: {article_name}')
-
-                    date_time_div = article_soup.find('div', class_="at-created label-with-icon")
-                    if date_time_div:
-                        date_time_span = date_time_div.find('span', class_="typography__StyledTypography-sc-owin6q-0 hcIsFR")
-                        date_time_text = date_time_span.text.strip()
-                        st.write(f'Date and Time: {date_time_text}')
-                    else:
-                        alt_date_time_div = article_soup.find('div', class_="align-right")
-                        alt_date_time_span = alt_date_time_div.find('span', class_="typography__StyledTypography-sc-owin6q-0 hcIsFR")
-                        alt_date_time_text = alt_date_time_span.text.strip() if alt_date_time_span else 'Date and Time not found'
-                        st.write(f'Date and Time (Alternative): {alt_date_time_text}')
-
-                    main_div = article_soup.find('div', class_='featured-imagestyles__FeaturedImageWrapper-sc-ojmof1-0 jGviVP at-rail-aligner at-rail-aligner-fi')
-
-                    if main_div:
-                        picture_tag = main_div.find('picture', class_='responsive-picturestyles__ResponsivePictureWrapper-sc-1urqrom-0 iLCXlQ')
-
-                        if picture_tag:
-                            img_tag = picture_tag.find('img')
-                            image_url = img_tag['src'] if img_tag else 'Image not found'
-                            st.image(image_url, caption='Article Image', use_column_width=True)
-                        else:
-                            st.write('Image not found within main div.')
-                    else:
-                        main_div2 = article_soup.find('div', class_='featured-imagestyles__FeaturedImageWrapper-sc-ojmof1-0 jGviVP featured-media featured-media-fi')
-                        if main_div2:
-                            picture_tag2 = main_div2.find('picture', class_='responsive-picturestyles__ResponsivePictureWrapper-sc-1urqrom-0 iLCXlQ')
-
-                            if picture_tag2:
-                                img_tag2 = picture_tag2.find('img')
-                                image_url2 = img_tag2['src'] if img_tag2 else 'Image not found'
-                                st.image(image_url2, caption='Article Image', use_column_width=True)
-                            else:
-                                st.write('Image not found within picture tag.')
-                        else:
-                            st.write('Image not in article.')
-
-                    divs = article_soup.find_all('div', class_=["common-textstyles__StyledWrapper-sc-18pd49k-0 eSbCkN"])
-                    st.header('Article Content')
-                    for div in divs:
-                        p_tags = div.find_all('p')
-                        for p_tag in p_tags:
-                            p_text = p_tag.text.strip()
-                            st.write(p_text)
-                else:
-                    st.write(f'{i+1}. Article Name not found. Moving to the next article.\n')
-
-                # Add a separator between articles
-                st.markdown("---")
+    run_news_site_tab('coindesk_news', "Tab 3: Coin Desk News", headline_mode=True)
 
 
 def run_tab4():
@@ -1186,14 +2352,23 @@ def run_tab4():
         DEVELOPER_KEY = st.secrets['YOUTUBE_API_KEY']
         CHANNEL_IDS = ['UCfdrZpVbXl_HnmyYYo-N6Ig', 'UCk6jF6z-IZx4H00QTYlHwjw', 'UCMtJYS0PrtiUwlk6zjGDEMA', 'UCKQvGU-qtjEthINeViNbn6A', 'UCqK_GSMbpiV8spgD3ZGloSw', 'UCBCbEDO5tMP6saX9yNU_zYQ','UCN9Nj4tjXbVTLYWN0EKly_Q']
         num_videos = st.number_input('Enter the number of videos to display', min_value=1, max_value=5, value=5)
-        for channel_id in CHANNEL_IDS:
-            latest_videos = get_latest_videos(DEVELOPER_KEY, channel_id, max_results=num_videos)
-            if latest_videos:
+        # Metadata comes from the store; only new uploads and stale view counts are looked up
+        channels, new_video_ids = poll_youtube_channels(DEVELOPER_KEY, CHANNEL_IDS)
+        channel_video_ids = {channel_id: channel['video_ids'][:num_videos] for channel_id, channel in channels.items()}
+
+        all_video_ids = [video_id for video_ids in channel_video_ids.values() for video_id in video_ids]
+        videos = get_youtube_channel_store().get_videos(all_video_ids)
+        st.caption(f"{len(new_video_ids)} new videos since the last poll; {get_youtube_quota()['units']} API quota units used by this process.")
+        # Transcripts are shown from the local store; only videos it hasn't seen are downloaded
+        downloaded = fill_transcript_store(all_video_ids)
+        transcripts = get_transcript_store().get_many(all_video_ids)
+        st.caption(f"Transcripts: {len(all_video_ids) - downloaded} from the local store, {downloaded} downloaded.")
+        for channel_id, video_ids in channel_video_ids.items():
+            if video_ids:
                 print(f"\nLatest Videos for Channel {channel_id}:")
-                for video in latest_videos:
-                    video_id = video['snippet']['resourceId']['videoId']
-                    video_url = f"https://www.youtube.com/watch?v={video_id}"
-                    fetch_video_details(video_url, DEVELOPER_KEY, channel_id)
+                for video_id in video_ids:
+                    if video_id in videos:
+                        display_video_details(videos[video_id], channels[channel_id]['title'], transcripts.get(video_id, []))
             else:
                 print(f"No videos found for Channel {channel_id}.")
     # os.remove(temp_key_file_path)
@@ -1211,254 +2386,19 @@ def run_tab4():
     os.remove(temp_key_file_path)
 
 def run_tab5():
-    st.subheader("Tab 5: News BTC News")
-    num_articles = st.number_input("Enter the number of articles to retrieve:", value=1, min_value=1, step=1)
-    total_articles_displayed = 0  # Track the total number of articles displayed
-
-    with st.spinner("Scraping data..."):
-        base_url = 'https://www.newsbtc.com/news/'
-        response = requests.get(base_url)
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        first_container = soup.find_all('h2', class_='jeg_post_title')
-        for fisrt in first_container:
-            if total_articles_displayed >= num_articles:
-                break
-
-            link = fisrt.find('a')
-            if link:
-                url = link.get('href')
-                response = requests.get(url)
-                article_soup = BeautifulSoup(response.text, 'html.parser')
-
-                article_name = article_soup.find('h1', class_='jeg_post_title').text.strip()
-                st.markdown(f'# {article_name}')
-
-                img_tag = article_soup.find('div', class_='single-post-hero-background').find('img')
-                if img_tag:
-                    img_src = img_tag.get('src')
-                    st.image(img_src, caption='Article Image', use_column_width=True)
-
-                date_div = article_soup.find('div', class_='jeg_meta_date')
-                article_date = date_div.find('a').text.strip()
-                st.write(f'**Article Date:** {article_date}')
-
-                content_div = article_soup.find('div', class_='content-inner')
-                paragraphs = content_div.find_all('p')
-                for paragraph in paragraphs:
-                    st.markdown(paragraph.text)
-
-                st.markdown("---")
-                total_articles_displayed += 1
-
-        # Find all 'a' tags within the h3 elements
-        anchor_tags = soup.find_all('h3', class_='jeg_post_title')
-
-        for a_tag in anchor_tags:
-            if total_articles_displayed >= num_articles:
-                break
-
-            link = a_tag.find('a')
-            if link:
-                url = link.get('href')
-                # st.markdown(f"[{url}]({url})")
-
-                response = requests.get(url)
-                article_soup = BeautifulSoup(response.text, 'html.parser')
-
-                article_name = article_soup.find('h1', class_='jeg_post_title').text.strip()
-                st.markdown(f'# . {article_name}')
-
-                img_tag = article_soup.find('div', class_='single-post-hero-background').find('img')
-                if img_tag:
-                    img_src = img_tag.get('src')
-                    st.image(img_src, caption='Article Image', use_column_width=True)
-
-                date_div = article_soup.find('div', class_='jeg_meta_date')
-                article_date = date_div.find('a').text.strip()
-                st.write(f'**Article Date:** {article_date}')
-
-                content_div = article_soup.find('div', class_='content-inner')
-                paragraphs = content_div.find_all('p')
-                for paragraph in paragraphs:
-                    st.markdown(paragraph.text)
-
-                st.markdown("---")
-                total_articles_displayed += 1
+    run_news_site_tab('newsbtc', "Tab 5: News BTC News")
 
 def run_tab6():
-    st.subheader("Tab 6: Crypto News")
-    num_articles = st.number_input("Enter the number of articles to retrieve:", value=1, min_value=1, step=1)
-    with st.spinner("Scrapping data..."):
-        base_url = 'https://crypto.news/news/'
-        response = requests.get(base_url)
-
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        # Find all 'a' tags within the 'p' tags inside the post_loop_content_div
-        all_links = soup.find_all('p', class_='post-loop__title')
-
-        for i, all_links in enumerate(all_links[:num_articles]):
-            link = all_links.find('a')
-            if link:
-                href = link.get('href')
-                if href:
-                    st.write(f"[{link.text}]({href})")
-                    response = requests.get(href)
-
-                    article_soup = BeautifulSoup(response.text, 'html.parser')
-
-                    article_name = article_soup.find('h1', class_='post-detail__title').text.strip()
-                    st.title(f'# {i+1}.Article Name: {article_name}')
-
-                    date_time = article_soup.find('time', class_='post-detail__date').text.strip()
-                    st.write(f'Date: {date_time}')
-
-                    image_div = article_soup.find('div', class_='post-detail__media')
-
-                    # Find the img tag within the post_detail_media_div
-                    img_tag = image_div.find('img')
-
-                    # Extract and print the src attribute
-                    if img_tag:
-                        img_url = img_tag.get('src')
-                        if img_url:
-                            st.image(img_url, caption='Image', use_column_width=True)
-
-                    article_div = article_soup.find('div', class_='post-detail__content')
-
-                    # Find all 'p' tags within the post_detail_content_div
-                    all_paragraphs = article_div.find_all('p')
-
-                    # Extract and print the text content of each 'p' tag
-                    for paragraph in all_paragraphs:
-                        st.write(paragraph.get_text(strip=True), unsafe_allow_html=True)
+    run_news_site_tab('crypto_news', "Tab 6: Crypto News")
 
 def run_tab7():
-    with st.spinner("Scrapping data..."):
-        st.subheader("Coindesk Market Scraper")
-    
-        num_articles = st.number_input("Enter the number of articles to retrieve:", value=1, min_value=1, step=1)
-        driver = webdriver.Chrome(service=get_webdriver_service(), options=get_webdriver_options())
-        base_url = 'https://www.coindesk.com/markets/'
-        driver.get(base_url)
-
-        wait = WebDriverWait(driver, 30)  # Increased timeout
-        wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, 'h5.typography__StyledTypography-sc-owin6q-0.keiOrg')))
-
-        page_source = driver.page_source
-
-        soup = BeautifulSoup(page_source, 'html.parser')
-        h5_tags = soup.find_all('h5', class_="typography__StyledTypography-sc-owin6q-0 keiOrg")
-        for i, container in enumerate(h5_tags[:num_articles]):
-            link = container.find('a', class_="card-title")
-            if link:
-                href = link.get('href')
-                full_url = f'https://www.coindesk.com/{href}'
-                st.write(full_url)
-                scrape_and_display_article(full_url)
-
-        driver.quit()
+    run_news_site_tab('coindesk_markets', "Coindesk Market Scraper", headline_mode=True)
 
 def run_tab8():
-    with st.spinner("Scrapping data..."):
-        st.subheader("Coindesk Finance Scraper")
-    
-        num_articles = st.number_input("Enter the number of articles to retrieve:", value=1, min_value=1, step=1)
-        driver = webdriver.Chrome(service=get_webdriver_service(), options=get_webdriver_options())
-        base_url = 'https://www.coindesk.com/business/'
-        driver.get(base_url)
-
-        wait = WebDriverWait(driver, 30)  # Increased timeout
-        wait.until(EC.presence_of_all_elements_located((By.CSS_SELECTOR, 'h5.typography__StyledTypography-sc-owin6q-0.keiOrg')))
-
-        page_source = driver.page_source
-
-        soup = BeautifulSoup(page_source, 'html.parser')
-        h5_tags = soup.find_all('h5', class_="typography__StyledTypography-sc-owin6q-0 keiOrg")
-        for i, container in enumerate(h5_tags[:num_articles]):
-            link = container.find('a', class_="card-title")
-            if link:
-                href = link.get('href')
-                full_url = f'https://www.coindesk.com/{href}'
-                st.write(full_url)
-                scrape_and_display_article(full_url)
-
-        driver.quit()
-
+    run_news_site_tab('coindesk_business', "Coindesk Finance Scraper", headline_mode=True)
 
 def run_tab9():
-    st.subheader("Tab 9: Coin Telegraph")
-    
-    # Get the number of articles from the user
-    num_articles = st.number_input("Enter the number of articles", value=5, min_value=1, max_value=20)
-
-    url = 'https://cointelegraph.com/category/latest-news'
-
-    chrome_options = webdriver.ChromeOptions()
-    user_agent = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/83.0.4103.116 Safari/537.36'
-    chrome_options.add_argument(f'user-agent={user_agent}')
-    chrome_options.add_argument('--headless')
-    chrome_options.add_argument('--no-sandbox')  
-    chrome_options.add_argument('--disable-dev-shm-usage')  
-
-    # Use st.spinner to show a loading spinner while the content is being fetched
-    with st.spinner("Fetching content..."):
-        driver = webdriver.Chrome(options=chrome_options)
-        driver.get(url)
-        driver.implicitly_wait(5)
-        page_source = driver.page_source
-        driver.quit()
-
-    soup = BeautifulSoup(page_source, 'html.parser')
-
-    allPage = soup.find('div', class_="category-page__content-col")
-    MainDiv = allPage.find('div', class_="group category-page__posts inline")
-    allList = MainDiv.find_all('li', class_="group-[.inline]:mb-8")
-
-    # Loop through the specified number of articles
-    for i, a_tag in enumerate(allList[:num_articles]):
-        listRightDiv = a_tag.find('div', class_="post-card-inline__content")
-        rightDivHeader = listRightDiv.find('div', class_="post-card-inline__header")
-        all_links = rightDivHeader.find_all('a', class_='post-card-inline__title-link')
-
-        for a in all_links:
-            href_attribute = a.get('href')
-            full_url = f'https://cointelegraph.com/{href_attribute}'
-            st.write(full_url)
-            date_time = rightDivHeader.find('time', class_='post-card-inline__date').text.strip()
-            st.write(f'Article Date: {date_time}')
-
-            # Show loading spinner for the article content
-            with st.spinner("Fetching article content..."):
-                driver = webdriver.Chrome(options=chrome_options)
-                driver.get(full_url)
-                driver.implicitly_wait(5)
-                page_source = driver.page_source
-                driver.quit()
-
-            article_soup = BeautifulSoup(page_source, 'html.parser')
-            first_div = article_soup.find('div', class_='post post-page__article')
-            second_div = first_div.find('article', class_='post__article')
-            article_name = second_div.find('h1', class_='post__title').text.strip()
-            st.write(f'# Article Name: {article_name}')
-
-            img_div = article_soup.find('div', class_='lazy-image post-cover__image lazy-image_loaded lazy-image_immediate')
-            img_tag = img_div.find('img')
-            image_url = img_tag['src']
-            st.image(image_url, caption='Image', use_column_width=True)
-
-            article_content = article_soup.find('div', class_='post-content relative')
-            paragraphs = article_content.find_all('p')
-
-            # Convert paragraphs to a markdown string
-            article_markdown = "\n\n".join([para.text for para in paragraphs])
-            st.markdown(article_markdown)
-            st.markdown("---")
-
-            # Break the loop if the specified number of articles is reached
-            if i == num_articles - 1:
-                break
+    run_news_site_tab('cointelegraph', "Tab 9: Coin Telegraph", default_articles=5, max_articles=20)
 
 def run_tab10():
     minutes_database = st.number_input("Enter the number of minutes to retrieve data from the database:", value=30, min_value=1)
@@ -1471,19 +2411,13 @@ def run_tab10():
         df_database.to_excel(excel_filename_db, index=False)
         st.success(f"Data fetched from the database and saved to {excel_filename_db}")
 
-    database_url = st.secrets['DATABASE_URL']
-    # database_url = os.getenv("DATABASE_URL")
-
     df_database = pd.DataFrame()
 
     if st.button("Fetch Data from News"):
         try:
-            connection = psycopg2.connect(database_url, sslmode='require')
-
             query = "SELECT * FROM news_data WHERE data_source = 'News BTC' LIMIT 5"
-            df_database = pd.read_sql(query, connection)
-
-            connection.close()
+            with get_database_pool().connection() as connection:
+                df_database = pd.read_sql(query, connection)
 
             st.write("Fetched data from the database:")
             st.write(df_database)
@@ -1497,12 +2431,9 @@ def run_tab10():
 
     if st.button("Fetch Data from Youtube"):
         try:
-            connection = psycopg2.connect(database_url, sslmode='require')
-
             query = "SELECT * FROM youtube_data LIMIT 5"
-            df_database = pd.read_sql(query, connection)
-
-            connection.close()
+            with get_database_pool().connection() as connection:
+                df_database = pd.read_sql(query, connection)
 
             st.write("Fetched data from the database:")
             st.write(df_database)
@@ -1517,43 +2448,56 @@ def run_tab10():
 def run_tab11():
     st.title('Tweet Stats Per Channel')
 
-    conn = connect_to_database()
-
-    tweets, yesterday_str = get_tweets_last_day(conn)  
-
-    stats = calculate_stats(tweets)
-
-    st.write(f'**Stats for {yesterday_str}:**')
-    for channel, count in stats.items():
-        st.write(f"- {channel}: {count} tweets")
+    with get_database_pool().connection() as conn:
+        yesterday_str = (datetime.datetime.now() - timedelta(days=1)).strftime("%Y-%m-%d")
+        stats = get_tweet_counts(conn, yesterday_str)
 
-    fig, ax = plt.subplots()
-    ax.bar(stats.keys(), stats.values())
-    ax.set_xlabel('Channels')
-    ax.set_ylabel('Number of Tweets')
-    ax.set_title(f"Tweet Stats Per Channel {yesterday_str}")
-    plt.xticks(rotation=45)
-    st.pyplot(fig)
-
-    if st.button("Fetch Data from Twitter"):
-        df_tweets = pd.DataFrame(tweets, columns=['id', 'data_source', 'tweet_text', 'time_stamp'])
+        st.write(f'**Stats for {yesterday_str}:**')
+        for channel, count in stats.items():
+            st.write(f"- {channel}: {count} tweets")
 
-        # Display the DataFrame in Streamlit
-        st.title(f"Data of Tweets for {yesterday_str}")
-        st.dataframe(df_tweets)
+        fig, ax = plt.subplots()
+        ax.bar(stats.keys(), stats.values())
+        ax.set_xlabel('Channels')
+        ax.set_ylabel('Number of Tweets')
+        ax.set_title(f"Tweet Stats Per Channel {yesterday_str}")
+        plt.xticks(rotation=45)
+        st.pyplot(fig)
 
-    conn.close()
+        days = st.number_input("Days of history per channel:", value=7, min_value=1, max_value=TWITTER_ROLLUP_BACKFILL_DAYS)
+        # The history is optional: without the rollup (e.g. no CREATE privilege) only it is hidden
+        try:
+            refresh_twitter_daily_rollup(conn)
+            daily = get_daily_tweet_counts(conn, days)
+        except psycopg2.Error as e:
+            conn.rollback()
+            print(f"An error occurred while reading the daily tweet rollup: {e}")
+            st.caption("Daily history is unavailable.")
+            daily = pd.DataFrame()
+        if not daily.empty:
+            fig, ax = plt.subplots()
+            daily.plot(kind='bar', ax=ax)
+            ax.set_xlabel('Day')
+            ax.set_ylabel('Number of Tweets')
+            ax.set_title(f"Tweets Per Channel Per Day, last {days} days")
+            plt.xticks(rotation=45)
+            st.pyplot(fig)
+
+        # Raw tweets are only read when asked for
+        if st.button("Fetch Data from Twitter"):
+            df_tweets = get_tweets_since(conn, yesterday_str)
+
+            # Display the DataFrame in Streamlit
+            st.title(f"Data of Tweets for {yesterday_str}")
+            st.dataframe(df_tweets)
 
 def fetch_data():
-    # conn_string = os.getenv("DATABASE_URL")
-    conn_string = st.secrets["DATABASE_URL"]
-    conn = psycopg2.connect(conn_string)
-    cur = conn.cursor()
-    query = "SELECT * FROM coinmarket_historical_data"
-    cur.execute(query)
-    data = cur.fetchall()
-    cur.close()
-    conn.close()
+    with get_database_pool().connection() as conn:
+        cur = conn.cursor()
+        query = "SELECT * FROM coinmarket_historical_data"
+        cur.execute(query)
+        data = cur.fetchall()
+        cur.close()
     return data
 
 def run_tab12():
@@ -1575,15 +2519,12 @@ def run_tab13():
     plot_line_graph(df, frequency)    
 
 def fetch_data_fundraising():
-    # conn_string = os.getenv("DATABASE_URL")
-    conn_string = st.secrets["DATABASE_URL"]
-    conn = psycopg2.connect(conn_string)
-    cur = conn.cursor()
-    query = "SELECT * FROM fundraising_data"
-    cur.execute(query)
-    data = cur.fetchall()
-    cur.close()
-    conn.close()
+    with get_database_pool().connection() as conn:
+        cur = conn.cursor()
+        query = "SELECT * FROM fundraising_data"
+        cur.execute(query)
+        data = cur.fetchall()
+        cur.close()
     return data
 
 def run_tab14():
@@ -1698,7 +2639,7 @@ def fetch_coin_data(api_key, limit=5000):
     headers = {
         "X-CMC_PRO_API_KEY": api_key
     }
-    response = requests.get(url, headers=headers)
+    response = get_http_session().get(url, headers=headers)
     if response.status_code == 200:
         return response.json()['data']
     else:
@@ -1867,13 +2808,6 @@ def run_tab17():
 
 
 def run_tab18():
-    # connection_string = os.getenv("DATABASE_URL")
-    connection_string = st.secrets["DATABASE_URL"]
-
-    # Connect to PostgreSQL database
-    conn = psycopg2.connect(connection_string)
-    cursor = conn.cursor()
-
     def calculate_percentage_change(current_price, old_price):
         if old_price == 0:
             return None  # Return None or any other default value
@@ -1907,30 +2841,29 @@ def run_tab18():
         st.subheader("List of coins with price change ({:.2f}% from 6 months ago)".format(price_change_desired))
         st.write("Coin Name | Symbol | Price Change % (+/-)")
         
-        # Fetch all coins
-        cursor.execute("SELECT DISTINCT symbol, coin_name FROM coinmarket_historical_data")
-        coins = cursor.fetchall()
-        from datetime import datetime, timedelta
-        # Filter coins based on price change
-        for coin in coins:
-            symbol, coin_name = coin
-            latest_price = fetch_latest_price(symbol)
-            if latest_price is not None:
-                six_months_ago_price = fetch_historical_price(symbol, datetime.now() - timedelta(days=170))
-                if six_months_ago_price is not None:
-                    percentage_change = calculate_percentage_change(latest_price, six_months_ago_price)
-                    # if (price_change_desired >= 0 and percentage_change >= price_change_desired) or \
-                    #    (price_change_desired < 0 and percentage_change <= price_change_desired):
-                    if percentage_change is not None:
-                        if percentage_change >= price_change_desired:
-                            st.write("{} | {} | {:.2f}".format(coin_name, symbol, percentage_change))
+        # Only hold a pooled connection while filtering
+        with get_database_pool().connection() as conn:
+            cursor = conn.cursor()
+
+            # Fetch all coins
+            cursor.execute("SELECT DISTINCT symbol, coin_name FROM coinmarket_historical_data")
+            coins = cursor.fetchall()
+            from datetime import datetime, timedelta
+            # Filter coins based on price change
+            for coin in coins:
+                symbol, coin_name = coin
+                latest_price = fetch_latest_price(symbol)
+                if latest_price is not None:
+                    six_months_ago_price = fetch_historical_price(symbol, datetime.now() - timedelta(days=170))
+                    if six_months_ago_price is not None:
+                        percentage_change = calculate_percentage_change(latest_price, six_months_ago_price)
+                        # if (price_change_desired >= 0 and percentage_change >= price_change_desired) or \
+                        #    (price_change_desired < 0 and percentage_change <= price_change_desired):
+                        if percentage_change is not None:
+                            if percentage_change >= price_change_desired:
+                                st.write("{} | {} | {:.2f}".format(coin_name, symbol, percentage_change))
 
 def run_tab19():
-    # Function to connect to PostgreSQL database using a connection string
-    def connect_db(conn_string):
-        conn = psycopg2.connect(conn_string)
-        return conn
-    
     def fetch_current_values(conn, id=1):
         cur = conn.cursor()
         cur.execute("SELECT quantity, leverage FROM quantity_leverage_table WHERE id = %s", (id,))
@@ -1946,13 +2879,8 @@ def run_tab19():
     # Streamlit UI
     st.title("Update Quantity and Leverage")
 
-    # Connection string
-    # conn_string = os.getenv("DATABASE_URL")
-    conn_string = st.secrets["DATABASE_URL"]
-
-    conn = connect_db(conn_string)
-
-    current_quantity, current_leverage = fetch_current_values(conn)
+    with get_database_pool().connection() as conn:
+        current_quantity, current_leverage = fetch_current_values(conn)
 
     st.subheader("Current Values")
     st.write(f"Current Quantity: {current_quantity}")
@@ -1964,23 +2892,154 @@ def run_tab19():
 
     if st.button("Update"):
         try:
-            update_values(conn, quantity, leverage)
+            with get_database_pool().connection() as conn:
+                update_values(conn, quantity, leverage)
+                new_quantity, new_leverage = fetch_current_values(conn)
             st.success("Values Updated Successfully!")
 
-            new_quantity, new_leverage = fetch_current_values(conn)
             st.subheader("Updated Values")
             st.write(f"New Quantity: {new_quantity}")
             st.write(f"New Leverage: {new_leverage}")
         except Exception as e:
             st.error(f"Error: {e}")
+
+BENCHMARK_PAGE_LOAD_URLS = [
+    'https://decrypt.co/news',
+    'https://www.coindesk.com/markets/',
+    'https://cointelegraph.com/category/latest-news'
+]
+
+def benchmark_page_loads(urls, repeats=3):
+    # Median driver.get time per site for the full browser profile against the scrape profile
+    rows = []
+    for profile in ['full', 'scrape']:
+        driver = create_webdriver(profile)
+        try:
+            for url in urls:
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    driver.get(url)
+                    rows.append({'site': urlparse(url).netloc, 'profile': profile, 'seconds': time.perf_counter() - start})
         finally:
-            conn.close()
+            driver.quit()
+
+    df = pd.DataFrame(rows).groupby(['site', 'profile'])['seconds'].median().unstack()
+    df['saved_seconds'] = df['full'] - df['scrape']
+    return df
+
+BENCHMARK_FIXTURES_DIR = 'benchmark_fixtures'
+BENCHMARK_PARSE_FIXTURES = [
+    ('coindesk_news', 'https://www.coindesk.com/tag/news/', COINDESK_NEWS_CARDS),
+    ('newsbtc', 'https://www.newsbtc.com/news/', NEWSBTC_HEADLINES),
+    ('crypto_news', 'https://crypto.news/news/', CRYPTO_NEWS_HEADLINES)
+]
+
+def load_benchmark_fixtures():
+    # Pages are saved on first use so later runs compare parsers on identical input
+    os.makedirs(BENCHMARK_FIXTURES_DIR, exist_ok=True)
+    paths = {name: os.path.join(BENCHMARK_FIXTURES_DIR, f'{name}.html') for name, _, _ in BENCHMARK_PARSE_FIXTURES}
+    missing = [(name, url) for name, url, _ in BENCHMARK_PARSE_FIXTURES if not os.path.exists(paths[name])]
+    for (name, _), html in zip(missing, fetch_pages([url for _, url in missing])):
+        with open(paths[name], 'w', encoding='utf-8') as f:
+            f.write(html)
+
+    fixtures = {}
+    for name, path in paths.items():
+        with open(path, encoding='utf-8') as f:
+            fixtures[name] = f.read()
+    return fixtures
+
+def benchmark_parsers(fixtures, repeats=5):
+    # Median parse time per fixture for each installed backend, with and without the site's strainer
+    parsers = [parser for parser, module in [('html.parser', None), ('lxml', 'lxml'), ('html5lib', 'html5lib')] if module is None or importlib.util.find_spec(module)]
+    strainers = {name: strainer for name, _, strainer in BENCHMARK_PARSE_FIXTURES}
+    rows = []
+    for name, html in fixtures.items():
+        for parser in parsers:
+            for label, strainer in [('full tree', None), ('strained', strainers[name])]:
+                timings = []
+                for _ in range(repeats):
+                    start = time.perf_counter()
+                    parse_html(html, strainer, parser)
+                    timings.append(time.perf_counter() - start)
+                rows.append({'fixture': name, 'parser': parser, 'tree': label, 'ms': statistics.median(timings) * 1000})
+    return pd.DataFrame(rows).pivot_table(index=['fixture', 'parser'], columns='tree', values='ms')
+
+def benchmark_youtube_client(api_key, channel_id, repeats=5):
+    # Per call: build a fresh client (as every YouTube helper used to) vs reuse the cached one.
+    # Each call is a channels().list for one channel; the first cached call includes the connect.
+    rows = []
+    for mode in ['build per call', 'cached client']:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            if mode == 'build per call':
+                youtube = googleapiclient.discovery.build("youtube", "v3", developerKey=api_key)
+                http = None  # the fresh client's own connection
+            else:
+                youtube = get_youtube_client(api_key)
+                http = get_youtube_http()
+            built = time.perf_counter()
+            youtube.channels().list(part="snippet", id=channel_id).execute(http=http)
+            rows.append({'mode': mode, 'build_ms': (built - start) * 1000, 'call_ms': (time.perf_counter() - built) * 1000})
+    return pd.DataFrame(rows).groupby('mode').median()
+
+def run_tab20():
+    st.title("Scraper Benchmarks")
+
+    st.subheader("HTML parser backends")
+    st.caption(f"Fixtures are read from ./{BENCHMARK_FIXTURES_DIR}; the scrapers currently parse with {HTML_PARSER}.")
+    if st.button("Run parser benchmark"):
+        with st.spinner("Parsing fixtures..."):
+            st.dataframe(benchmark_parsers(load_benchmark_fixtures()))
+
+    st.subheader("Browser page load: full vs scrape profile")
+    repeats = st.number_input("Loads per site and profile:", value=3, min_value=1, max_value=10)
+    if st.button("Run page load benchmark"):
+        with st.spinner("Loading pages..."):
+            st.dataframe(benchmark_page_loads(BENCHMARK_PAGE_LOAD_URLS, repeats))
+
+    st.subheader("Database connection pool")
+    st.caption("Checkouts and time spent waiting for a pooled Postgres connection since the app started.")
+    st.json(get_database_pool().stats())
+
+    st.subheader("YouTube client: build per call vs cached")
+    if st.button("Run YouTube client benchmark"):
+        with st.spinner("Calling the YouTube API..."):
+            st.dataframe(benchmark_youtube_client(st.secrets['YOUTUBE_API_KEY'], 'UCfdrZpVbXl_HnmyYYo-N6Ig'))
+
+def run_tab21():
+    st.title("All News")
+    per_site = st.number_input("Articles per source:", value=5, min_value=1, max_value=20, step=1)
+
+    if st.button("Build feed"):
+        start = time.perf_counter()
+        with st.spinner(f"Scraping {len(SITE_SPECS)} sources..."):
+            feed, timings = scrape_all_news(per_site)
+        slowest = max(timings, key=timings.get)
+        st.caption(
+            f"{len(feed)} unique articles in {time.perf_counter() - start:.2f}s "
+            f"(slowest source: {slowest}, {timings[slowest]:.2f}s; sum of sources {sum(timings.values()):.2f}s)."
+        )
+
+        st.download_button(
+            "Download feed as CSV",
+            feed.to_csv(index=False).encode('utf-8'),
+            file_name='all_news.csv',
+            mime='text/csv'
+        )
+
+        for article in feed.to_dict('records'):
+            st.markdown(f"**{article['source']}** · {article['date']}  \n[{article['title']}]({article['url']})")
+            with st.expander("Read article"):
+                if article['image_url']:
+                    st.image(article['image_url'], caption='Article Image', use_column_width=True)
+                st.markdown(article['body'])
 
 # Main Streamlit UI
 st.title("DATA SCRAPPER")
 
 # Create tabs using st.selectbox
-selected_tab = st.selectbox("Select Tab", ["Discord", "Decrypt News","Coin Desk News","YouTube", "News BTC", "Crypto News", "Coin Desk Market", "Coin Desk Finance", "Coin Telegraph", "Data From Database", "Twitter Stats", "Coin Market Cap Data", "Coin Market Cap Graph", "Coin Fundraising Data", "Chat with Database", "PDF Research Report", "Coin Filtering Today", "Coin Filtering Historical", "Quantity and Leverage"])
+selected_tab = st.selectbox("Select Tab", ["Discord", "Decrypt News","Coin Desk News","YouTube", "News BTC", "Crypto News", "Coin Desk Market", "Coin Desk Finance", "Coin Telegraph", "Data From Database", "Twitter Stats", "Coin Market Cap Data", "Coin Market Cap Graph", "Coin Fundraising Data", "Chat with Database", "PDF Research Report", "Coin Filtering Today", "Coin Filtering Historical", "Quantity and Leverage", "Scraper Benchmarks", "All News"])
 
 # Display content based on the selected tab
 if selected_tab == "Discord":
@@ -2020,4 +3079,8 @@ elif selected_tab == "Coin Filtering Today":
 elif selected_tab == "Coin Filtering Historical":
     run_tab18()
 elif selected_tab == "Quantity and Leverage":
-    run_tab19()
\ No newline at end of file
+    run_tab19()
+elif selected_tab == "Scraper Benchmarks":
+    run_tab20()
+elif selected_tab == "All News":
+    run_tab21()
\ No newline at end of file